@@ -9,6 +9,10 @@ from typing import List, Optional, Tuple, Union, Dict, Set, Callable
 from time import time_ns
 from functools import wraps, cache
 from copy import copy
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from runner.instrumentation import timer
 
 
 # === Useful Functions === #
@@ -18,18 +22,6 @@ def splitlines(data: str, fun=lambda x: x) -> List[str]:
     return [fun(line) for line in data.splitlines() if line]
 
 
-def timer(f):
-    @wraps(f)
-    def wrapper(*args, **kwargs):
-        start = time_ns()
-        result = f(*args, **kwargs)
-        delta = (time_ns() - start) / 1000000.0
-        print(f'Elapsed time of {f.__name__}: {delta} ms')
-        return result
-
-    return wrapper
-
-
 # === Types === #
 
 
@@ -214,9 +214,9 @@ test_answer2 = 2713310158
 
 solves = [
     {'func': solve1, 'parse': parse_input1,
-        'test_data': test_data1, 'test_answer': test_answer1},
+        'test_data': test_data1, 'test_answer': test_answer1, 'mutates': True},
     {'func': solve2, 'parse': parse_input2,
-        'test_data': test_data2, 'test_answer': test_answer2},
+        'test_data': test_data2, 'test_answer': test_answer2, 'mutates': True},
 ]
 
 # ==== Template for running solutions ==== #
@@ -125,8 +125,8 @@ test_data2 = test_data1
 test_answer2 = 'MCD'
 
 solves = [
-    {'func': solve1, 'parse': parse_input1, 'test_data': test_data1, 'test_answer': test_answer1},
-    {'func': solve2, 'parse': parse_input2, 'test_data': test_data2, 'test_answer': test_answer2},
+    {'func': solve1, 'parse': parse_input1, 'test_data': test_data1, 'test_answer': test_answer1, 'mutates': True},
+    {'func': solve2, 'parse': parse_input2, 'test_data': test_data2, 'test_answer': test_answer2, 'mutates': True},
 ]
 
 # ==== Template for running solutions ==== #
@@ -5,7 +5,11 @@ import re
 import sys
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional, Tuple, Union, Dict, Set, Callable
+from typing import List, Optional, Tuple, Union, Dict, Set, Callable, Iterable
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from runner.inputs import iter_lines, streaming
 
 
 # === Useful Functions === #
@@ -26,16 +30,18 @@ class Input:
 # === Input parsing === #
 
 
-def parse_input(data: str, options: dict) -> Input:
-    lines = splitlines(data)
+def parse_input(data: Union[str, Iterable[str]], options: dict) -> Input:
+    lines = list(iter_lines(data))
     return Input(lines)
 
 
-def parse_input1(data: str) -> Input:
+@streaming
+def parse_input1(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
-def parse_input2(data: str) -> Input:
+@streaming
+def parse_input2(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
@@ -5,11 +5,17 @@ import math
 import re
 import sys
 from dataclasses import dataclass
-from enum import Enum
-from typing import List, Optional, Tuple, Union, Dict, Set, Callable
+from enum import Enum, IntFlag
+from typing import List, Optional, Tuple, Union, Dict, Set, Callable, Iterable
 from time import time_ns, sleep
 from functools import wraps, cache, cached_property, cmp_to_key
 from copy import copy
+from array import array
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from runner.inputs import iter_lines, streaming
+from runner.instrumentation import span, timer
 
 
 # === Useful Functions === #
@@ -19,18 +25,6 @@ def splitlines(data: str, fun=lambda x: x) -> List[str]:
     return [fun(line) for line in data.splitlines() if line]
 
 
-def timer(f):
-    @wraps(f)
-    def wrapper(*args, **kwargs):
-        start = time_ns()
-        result = f(*args, **kwargs)
-        delta = (time_ns() - start) / 1000000.0
-        print(f'Elapsed time of {f.__name__}: {delta} ms')
-        return result
-
-    return wrapper
-
-
 # === Types === #
 
 
@@ -45,161 +39,144 @@ class NodeType(Enum):
     start = 'S'
 
 
-class Node:
-    type: NodeType
-    x: int
-    y: int
-
-    def __init__(self, type: NodeType, x: int, y: int):
-        self.type = type
-        self.x = x
-        self.y = y
-
-    def __repr__(self):
-        return f'{self.type.value} ({self.x}, {self.y})'
-
-    @property
-    def pos(self) -> Tuple[int, int]:
-        return self.x, self.y
+class Direction(IntFlag):
+    north = 1
+    east = 2
+    south = 4
+    west = 8
 
-    @property
-    def top(self) -> bool:
-        return self.type in [NodeType.top_left, NodeType.top_right, NodeType.top_bottom, NodeType.start]
 
-    @property
-    def bottom(self) -> bool:
-        return self.type in [NodeType.bottom_right, NodeType.bottom_left, NodeType.top_bottom, NodeType.start]
+pipe_directions = {
+    NodeType.top_bottom: Direction.north | Direction.south,
+    NodeType.left_right: Direction.east | Direction.west,
+    NodeType.top_right: Direction.north | Direction.east,
+    NodeType.top_left: Direction.north | Direction.west,
+    NodeType.bottom_left: Direction.south | Direction.west,
+    NodeType.bottom_right: Direction.south | Direction.east,
+    NodeType.ground: 0,
+    # Until its shape is known the start connects to every side.
+    NodeType.start: Direction.north | Direction.east | Direction.south | Direction.west,
+}
+mask_table = bytes.maketrans(''.join(t.value for t in pipe_directions).encode(), bytes(pipe_directions.values()))
 
-    @property
-    def left(self) -> bool:
-        return self.type in [NodeType.left_right, NodeType.bottom_left, NodeType.top_left, NodeType.start]
-
-    @property
-    def right(self) -> bool:
-        return self.type in [NodeType.left_right, NodeType.bottom_right, NodeType.top_right, NodeType.start]
-
-    @property
-    def is_start(self):
-        return self.type == NodeType.start
+# Indexed by a single direction bit.
+opposite = [0, Direction.south, Direction.west, 0, Direction.north, 0, 0, 0, Direction.east]
 
 
 @dataclass
 class Input:
-    data: str
-    lines: List[str]
-    nodes: Dict[Tuple[int, int], Node]
-    start: Node
-    edges: Dict[Tuple[int, int], List[Node]]
+    # Maze padded with a ring of ground, one direction bitmask per cell,
+    # cell (x, y) is at index (y + 1) * width + x + 1.
+    width: int
+    height: int
+    cells: bytearray
+    start: int
+
+    def offsets(self) -> List[int]:
+        # Index step for moving in a single direction.
+        return [0, -self.width, 1, 0, self.width, 0, 0, 0, -1]
+
+    def position(self, index: int) -> Tuple[int, int]:
+        # Also converts a whole NumPy array of indices at once.
+        return index % self.width - 1, index // self.width - 1
 
 
 # === Input parsing === #
 
 
 @timer
-def parse_input(data: str, options: dict) -> Input:
-    lines = splitlines(data)
-
-    nodes = {}
-    edges = {}
-    start = None
-    # Build nodes, init edges, and find start.
-    for x in range(0, len(lines[0])):
-        for y in range(len(lines)):
-            node = Node(NodeType(lines[y][x]), x, y)
-            nodes[node.pos] = node
-            edges[node.pos] = []
-            if node.is_start:
-                start = node
-    # Build edges.
-    for node in nodes.values():
-        x, y = node.pos
-        if node.right:
-            right = nodes.get((x + 1, y))
-            if right and right.left:
-                edges[node.pos].append(right)
-                edges[right.pos].append(node)
-        if node.bottom:
-            bottom = nodes.get((x, y + 1))
-            if bottom and bottom.top:
-                edges[node.pos].append(bottom)
-                edges[bottom.pos].append(node)
-    if not start:
+def parse_input(data: Union[str, Iterable[str]], options: dict) -> Input:
+    cells = bytearray()
+    width = None
+    for line in iter_lines(data):
+        if width is None:
+            width = len(line) + 2
+            cells += bytes(width)
+        cells += b'\0' + line.encode().translate(mask_table) + b'\0'
+    cells += bytes(width)
+    start = cells.find(pipe_directions[NodeType.start])
+    if start == -1:
         raise ValueError('Cannot find start node')
-    return Input(data, lines, nodes, start, edges)
+    return Input(width, len(cells) // width, cells, start)
 
 
-def parse_input_1(data: str) -> Input:
+@streaming
+def parse_input_1(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
-def parse_input_2(data: str) -> Input:
+@streaming
+def parse_input_2(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
 # === Solutions === #
 
 
-def generate_starting_loops(start: Node, connected_nodes: List[Node]) -> List[List[Node]]:
-    edges = {}
-    for node in connected_nodes:
-        edges[node.pos] = node
-    x, y = start.pos
-    left = edges.get((x - 1, y))
-    right = edges.get((x + 1, y))
-    top = edges.get((x, y - 1))
-    bottom = edges.get((x, y + 1))
-    if top and bottom:
-        yield [Node(NodeType.top_bottom, x, y), top]
-    if top and left:
-        yield [Node(NodeType.top_left, x, y), top]
-    if top and bottom:
-        yield [Node(NodeType.top_bottom, x, y), top]
-    if left and bottom:
-        yield [Node(NodeType.bottom_left, x, y), bottom]
-    if left and right:
-        yield [Node(NodeType.left_right, x, y), right]
-    if bottom and right:
-        yield [Node(NodeType.bottom_right, x, y), right]
-
-
-def find_main_loop(start: Node, edges: Dict[Tuple[int, int], List[Node]]) -> List[Node]:
-    max_loop_len = 0
-    max_loop = []
-    for loop in generate_starting_loops(start, edges[start.pos]):
-        finished = False
-        while True:
-            curr = len(loop) - 1
-            curr_node = loop[curr]
-            prev_node = loop[curr - 1]
-            if len(edges[curr_node.pos]) != 2:
-                break
-            for node in edges[curr_node.pos]:
-                if node.pos != prev_node.pos:
-                    loop.append(node)
-            if loop[len(loop) - 1].pos == start.pos:
-                finished = True
-                loop.pop()
+def walk_loop(input: Input, first: int, last: int) -> Optional[array]:
+    """Follows pipes leaving the start towards `first`, expecting to come back from `last`."""
+    cells = input.cells
+    offsets = input.offsets()
+    start = input.start
+    loop = array('q', [start])
+    index = start
+    direction = first
+    while True:
+        index += offsets[direction]
+        came = opposite[direction]
+        if index == start:
+            return loop if came == last else None
+        mask = cells[index]
+        if not mask & came:
+            return None
+        direction = mask ^ came
+        loop.append(index)
+
+
+def start_directions(input: Input) -> List[Direction]:
+    offsets = input.offsets()
+    return [d for d in Direction if input.cells[input.start + offsets[d]] & opposite[d]]
+
+
+def find_main_loop(input: Input) -> Tuple[numpy.ndarray, int]:
+    """Returns (x, y) coordinates of the loop through the start, in walking order, and its length."""
+    directions = start_directions(input)
+    # The start's shape follows from the neighbours pointing at it. Only when
+    # more than two do, the candidate shapes have to be tried one by one.
+    loop = None
+    for i, first in enumerate(directions):
+        for last in directions[i + 1:]:
+            loop = walk_loop(input, first, last)
+            if loop is not None:
                 break
+        if loop is not None:
+            break
+    if loop is None:
+        raise ValueError('Cannot find main loop')
 
-        if not finished:
-            continue
-        if max_loop_len < len(loop):
-            max_loop_len = len(loop)
-            max_loop = loop
-    return max_loop
+    indices = numpy.frombuffer(loop, dtype=numpy.int64)
+    coordinates = numpy.column_stack(input.position(indices))
+    return coordinates, len(loop)
 
 
 @timer
 def solve_1(input: Input) -> Optional[int]:
-    return len(find_main_loop(input.start, input.edges)) // 2
+    _, length = find_main_loop(input)
+    return length // 2
+
+
+def count_enclosed(coordinates: numpy.ndarray, length: int) -> int:
+    # Shoelace formula gives the area enclosed by the loop's cell centres,
+    # Pick's theorem turns it into the number of cells strictly inside.
+    xs = coordinates[:, 0]
+    ys = coordinates[:, 1]
+    doubled_area = abs(int(numpy.dot(xs, numpy.roll(ys, -1)) - numpy.dot(ys, numpy.roll(xs, -1))))
+    return (doubled_area - length) // 2 + 1
 
 
 @timer
 def solve_2(input: Input) -> Optional[int]:
-    main_loop = find_main_loop(input.start, input.edges)
-    dots = [node for node in input.nodes.values() if node.type == NodeType.ground]
-    print(dots)
-    return
+    return count_enclosed(*find_main_loop(input))
 
 
 # ==== Solutions with test data ==== #
@@ -231,12 +208,10 @@ test_answer_2 = 8
 
 @timer
 def main():
-    start = time_ns()
     filename = 'input.txt'
     with open(filename, 'r') as f:
-        input = f.read()
-        delta = (time_ns() - start) / 1000000.0
-        print(f'Elapsed time of reading file: {delta} ms')
+        with span('reading file'):
+            input = f.read()
 
         for number in range(1, 3):
             func = globals()[f'solve_{number}']
@@ -6,10 +6,15 @@ import re
 import sys
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional, Tuple, Union, Dict, Set, Callable
+from typing import List, Optional, Tuple, Union, Dict, Set, Callable, Iterable
 from time import time_ns, sleep
 from functools import wraps, cache, cached_property, cmp_to_key
 from copy import copy
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from runner.inputs import iter_lines, streaming
+from runner.instrumentation import span, timer
 
 
 # === Useful Functions === #
@@ -19,16 +24,9 @@ def splitlines(data: str, fun=lambda x: x) -> List[str]:
     return [fun(line) for line in data.splitlines() if line]
 
 
-def timer(f):
-    @wraps(f)
-    def wrapper(*args, **kwargs):
-        start = time_ns()
-        result = f(*args, **kwargs)
-        delta = (time_ns() - start) / 1000000.0
-        print(f'Elapsed time of {f.__name__}: {delta} ms')
-        return result
-
-    return wrapper
+def exact_dtype(bound: int):
+    # Python integers where values up to `bound` could overflow int64.
+    return numpy.int64 if bound < 2 ** 62 else object
 
 
 # === Types === #
@@ -36,102 +34,81 @@ def timer(f):
 
 @dataclass
 class Input:
-    data: str
-    lines: List[str]
-    expanded: List[str]
-    galaxies: List[Tuple[int, int]]
+    # Universe as a boolean galaxy mask; expansion is only recorded in the
+    # emptiness bitmaps and applied to coordinates when measuring distances.
+    grid: numpy.ndarray
+    empty_rows: numpy.ndarray
+    empty_cols: numpy.ndarray
+    xs: numpy.ndarray
+    ys: numpy.ndarray
 
 
 # === Input parsing === #
 
 
-def has_galaxies(lines: List[str], x: int) -> bool:
-    for y in range(0, len(lines)):
-        point = lines[y][x]
-        if point == '#':
-            return True
-    return False
+def parse_universe(lines: List[str]) -> numpy.ndarray:
+    cells = numpy.frombuffer(''.join(lines).encode(), dtype=numpy.uint8)
+    return cells.reshape(len(lines), -1) == ord('#')
 
 
-def expand_universe(lines: List[str]) -> List[str]:
-    expanded = []
-    empty_line = '.' * len(lines[0])
-    expanded_line = 'E' * len(lines[0])
-    for line in lines:
-        if line == empty_line:
-            expanded.append(expanded_line)
-        else:
-            expanded.append(line)
-    for x in range(len(lines[0]) - 1, -1, -1):
-        if has_galaxies(lines, x):
-            continue
-        for y in range(0, len(expanded)):
-            point = 'E'
-            expanded[y] = expanded[y][0:x] + point + expanded[y][x + 1:]
-    return expanded
-
-
-def find_galaxies(expanded: List[str]) -> List[Tuple[int, int]]:
-    galaxies = []
-    for y in range(0, len(expanded)):
-        line = expanded[y]
-        for x in range(0, len(line)):
-            if line[x] == '#':
-                galaxies.append((x, y))
-    return galaxies
+def find_galaxies(grid: numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    ys, xs = numpy.nonzero(grid)
+    return xs, ys
 
 
 @timer
-def parse_input(data: str, options: dict) -> Input:
-    lines = splitlines(data)
-
-    expanded = expand_universe(lines)
-    galaxies = find_galaxies(expanded)
-
-    return Input(data, lines, expanded, galaxies)
+def parse_input(data: Union[str, Iterable[str]], options: dict) -> Input:
+    grid = parse_universe(list(iter_lines(data)))
+    xs, ys = find_galaxies(grid)
+    return Input(grid, ~grid.any(axis=1), ~grid.any(axis=0), xs, ys)
 
 
-def parse_input_1(data: str) -> Input:
+@streaming
+def parse_input_1(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
-def parse_input_2(data: str) -> Input:
+@streaming
+def parse_input_2(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
 # === Solutions === #
 
 
-def calculate_distances(lines: List[str], galaxies: List[Tuple[int, int]], amount: int) -> int:
-    distances = []
-    for main_idx in range(0, len(galaxies)):
-        for pair_idx in range(main_idx + 1, len(galaxies)):
-            xa, ya = galaxies[main_idx]
-            xb, yb = galaxies[pair_idx]
+def expand_coordinates(coordinates: numpy.ndarray, empty: numpy.ndarray, amount: int) -> numpy.ndarray:
+    # Number of empty lines before each position, as an exclusive prefix sum.
+    empty_before = numpy.cumsum(empty, dtype=numpy.int64) - empty
+    shift = empty_before[coordinates]
+    dtype = exact_dtype(amount * len(empty))
+    return coordinates.astype(dtype) + (amount - 1) * shift.astype(dtype)
 
-            xd = 0
-            for x in range(min(xa, xb), max(xa, xb)):
-                y = min(ya, yb)
-                point = lines[y][x]
-                xd += amount if point in ['E', '='] else 1
 
-            yd = 0
-            for y in range(min(ya, yb), max(ya, yb)):
-                x = max(xa, xb)
-                point = lines[y][x]
-                yd += amount if point in ['E', '|'] else 1
-            distances.append(xd + yd)
-    return sum(distances)
+def sum_pairwise_distances(values: numpy.ndarray) -> int:
+    values = numpy.sort(values)
+    count = len(values)
+    if not count:
+        return 0
+    dtype = exact_dtype(abs(int(values[-1])) * count * count)
+    # Every value is added once per smaller value and subtracted once per larger one.
+    weights = 2 * numpy.arange(count, dtype=numpy.int64) - count + 1
+    return int(numpy.dot(values.astype(dtype), weights.astype(dtype)))
+
+
+def calculate_distances(input: Input, amount: int) -> int:
+    xs = expand_coordinates(input.xs, input.empty_cols, amount)
+    ys = expand_coordinates(input.ys, input.empty_rows, amount)
+    return sum_pairwise_distances(xs) + sum_pairwise_distances(ys)
 
 
 @timer
 def solve_1(input: Input) -> Optional[int]:
-    return calculate_distances(input.expanded, input.galaxies, 2)
+    return calculate_distances(input, 2)
 
 
 @timer
 def solve_2(input: Input) -> Optional[int]:
-    return calculate_distances(input.expanded, input.galaxies, 1000000)
+    return calculate_distances(input, 1000000)
 
 
 # ==== Solutions with test data ==== #
@@ -153,18 +130,21 @@ test_answer_1 = 374
 test_data_2 = test_data_1
 test_answer_2 = 82000210
 
+# Large enough for the sums to leave int64.
+test_data_large = test_data_1
+test_amount_large = 10 ** 18
+test_answer_large = 292 + 82 * (10 ** 18 - 1)
+
 
 # ==== Template for running solutions ==== #
 
 
 @timer
 def main():
-    start = time_ns()
     filename = 'input.txt'
     with open(filename, 'r') as f:
-        input = f.read()
-        delta = (time_ns() - start) / 1000000.0
-        print(f'Elapsed time of reading file: {delta} ms')
+        with span('reading file'):
+            input = f.read()
 
         for number in range(1, 3):
             func = globals()[f'solve_{number}']
@@ -183,6 +163,13 @@ def main():
             if slv is not None:
                 print(f'\nSolution {number} - The answer is {slv}\n')
 
+        slv = calculate_distances(parse_input_2(test_data_large), test_amount_large)
+        if slv == test_answer_large:
+            print('\nLarge expansion - Test has passed\n')
+        else:
+            print('\nLarge expansion - Test has failed.')
+            print(f'Correct: {test_answer_large}\nBut got: {slv}\n')
+
 
 if __name__ == '__main__':
     main()
@@ -2,14 +2,22 @@ from __future__ import annotations
 
 import numpy
 import math
+import multiprocessing
+import os
 import re
 import sys
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional, Tuple, Union, Dict, Set, Callable
+from typing import List, Optional, Tuple, Union, Dict, Set, Callable, Iterable
 from time import time_ns, sleep
 from functools import wraps, cache, cached_property, cmp_to_key
 from copy import copy
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from runner.inputs import iter_lines, streaming
+from runner.instrumentation import span, timer
 
 
 # === Useful Functions === #
@@ -19,18 +27,6 @@ def splitlines(data: str, fun=lambda x: x) -> List[str]:
     return [fun(line) for line in data.splitlines() if line]
 
 
-def timer(f):
-    @wraps(f)
-    def wrapper(*args, **kwargs):
-        start = time_ns()
-        result = f(*args, **kwargs)
-        delta = (time_ns() - start) / 1000000.0
-        print(f'Elapsed time of {f.__name__}: {delta} ms')
-        return result
-
-    return wrapper
-
-
 # === Types === #
 
 
@@ -46,20 +42,8 @@ class Row:
     damaged: List[int]
 
 
-@dataclass
-class Pattern:
-    left: str
-    right: Optional[str]
-
-    @property
-    def wiggle(self) -> bool:
-        return self.right is not None
-
-
 @dataclass
 class Input:
-    data: str
-    lines: List[str]
     rows: List[Row]
 
 
@@ -67,122 +51,104 @@ class Input:
 
 
 @timer
-def parse_input(data: str, options: dict) -> Input:
-    lines = splitlines(data)
+def parse_input(data: Union[str, Iterable[str]], options: dict) -> Input:
     rows = []
-    for line in lines:
+    for line in iter_lines(data):
         parts = line.split(' ')
         damaged = [int(d) for d in parts[1].split(',')]
         rows.append(Row(parts[0], damaged))
-    return Input(data, lines, rows)
+    return Input(rows)
 
 
-def parse_input_1(data: str) -> Input:
+@streaming
+def parse_input_1(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
-def parse_input_2(data: str) -> Input:
+@streaming
+def parse_input_2(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
 # === Solutions === #
 
 
-def count_potential_permutations(springs: str) -> int:
-    exp = 0
-    for s in springs:
-        if s == '?':
-            exp += 1
-    return pow(2, exp)
-
-
-start_left = r'[\.\?]*?'
-start_right = r'[\.\?]*'
-between_left = r'[\.\?]+?'
-between_right = r'[\.\?]+'
-end = r'[\.\?]*$'
-
-
-def damaged(length: int) -> str:
-    return r'([#\?]{' + str(length) + r'})'
-
-
-def between(length: int) -> str:
-    return r'[\.\?]{' + str(length) + r'}'
-
-
 def count_arrangements(row: Row) -> int:
-    patterns = [Pattern(start_left, start_right)]
-    # Example: r'^[\.\?]*?([#\?]{1})[\.\?]+?([#\?]{6})[\.\?]+([#\?]{5})[\.\?]*$'
-    for count, d in enumerate(row.damaged):
-        patterns.append(Pattern(damaged(d), None))
-        if count < len(row.damaged) - 1:
-            patterns.append(Pattern(between_left, between_right))
-    patterns.append(Pattern(end, None))
-
-    def patterns_step(left_regex: List[str], group: int) -> int:
-        print(f'Left regex = {left_regex}')
-        print(f'Group = {group}')
-        if len(left_regex) == len(patterns):
-            print('Patterns matched the length of left_regex')
-            return 1
-
-        if group > len(row.damaged):
-            print('Group exceeded number of damaged')
-            return 1
-
-        index = len(left_regex)
-        pattern = patterns[index]
-        if not pattern.wiggle:
-            new_regex = [r for r in left_regex]
-            new_regex.append(pattern.left)
-            return patterns_step(new_regex, group + 1)
-
-        before = ''.join(left_regex)
-        remaining = ''.join([patterns[idx].left for idx in range(index + 1, len(patterns))])
-        _left_regex = f'{before}({pattern.left}){remaining}'
-        print(f'Actual regex = {_left_regex}')
-        left_match = re.search(_left_regex, row.springs)
-        if not left_match:
-            return 0
-        left = left_match.start(group + 1)
-        vary_start = len(left_match.group(group))
-        _right_regex = before + pattern.right + remaining
-        right_match = re.search(_right_regex, row.springs)
-        right = right_match.start(group)
-        print(f'Left = {left}, right = {right}, vary_start = {vary_start}')
-
-        if left == right:
-            new_regex = [r for r in left_regex]
-            new_regex.append(pattern.left)
-            return patterns_step(new_regex, group)
-
-        count = 0
-        for vary in range(vary_start, vary_start + right - left + 1):
-            new_regex = [r for r in left_regex]
-            new_regex.append(between(vary))
-            count += patterns_step(new_regex, group)
-        return count
-
-    return patterns_step([], 1)
+    """Counts arrangements with a DP over (group index, current run length) per position.
+
+    Only the states of the previous position are kept, so memory per row is
+    bounded by the number of groups times the longest group.
+    """
+    groups = row.damaged
+    states = {(0, 0): 1}
+    for spring in row.springs + '.':
+        next_states = {}
+        for (group, run), count in states.items():
+            if spring != '.' and group < len(groups) and run < groups[group]:
+                key = (group, run + 1)
+                next_states[key] = next_states.get(key, 0) + count
+            if spring != '#':
+                if run == 0:
+                    key = (group, 0)
+                elif run == groups[group]:
+                    key = (group + 1, 0)
+                else:
+                    continue
+                next_states[key] = next_states.get(key, 0) + count
+        states = next_states
+    return states.get((len(groups), 0), 0)
+
+
+def unfold(row: Row, times: int = 5) -> Row:
+    return Row('?'.join([row.springs] * times), row.damaged * times)
+
+
+def estimate_cost(row: Row) -> int:
+    return len(row.springs) * len(row.damaged)
+
+
+def count_chunk(rows: List[Row]) -> int:
+    return sum(count_arrangements(row) for row in rows)
+
+
+def default_workers() -> int:
+    # Inside a pool worker (e.g. `python -m runner --jobs`) another pool would
+    # multiply the process count. Workers started without fork also can't find
+    # `count_chunk` unless this file runs as the main script.
+    if multiprocessing.parent_process() is not None:
+        return 1
+    if __name__ != '__main__' and multiprocessing.get_start_method() != 'fork':
+        return 1
+    return os.cpu_count() or 1
+
+
+def count_rows(rows: List[Row], workers: Optional[int] = None, min_cost: int = 10000000) -> int:
+    """Sums arrangements of all rows, spreading them over processes when that pays off.
+
+    Rows are dispatched most expensive first in small chunks, and idle workers
+    pull the next chunk, so a few long rows can't leave the others waiting.
+    The total is a plain integer sum, so the result doesn't depend on scheduling.
+    """
+    workers = workers or default_workers()
+    costs = [estimate_cost(row) for row in rows]
+    if workers == 1 or sum(costs) < min_cost:
+        return count_chunk(rows)
+
+    order = sorted(range(len(rows)), key=lambda idx: costs[idx], reverse=True)
+    size = max(1, len(rows) // (workers * 8))
+    chunks = [[rows[idx] for idx in order[start:start + size]] for start in range(0, len(order), size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(count_chunk, chunks))
 
 
 @timer
 def solve_1(input: Input) -> Optional[int]:
-    sum = 0
-    print()
-    for row in input.rows:
-        print(row)
-        arrangements = count_arrangements(row)
-        print(f'Arrangements = {arrangements}\n')
-        sum += arrangements
-    print()
-    return sum
+    return count_rows(input.rows)
 
 
 @timer
 def solve_2(input: Input) -> Optional[int]:
-    return
+    return count_rows([unfold(row) for row in input.rows])
 
 
 # ==== Solutions with test data ==== #
@@ -197,7 +163,7 @@ test_data_1 = """???.### 1,1,3
 test_answer_1 = 21
 
 test_data_2 = test_data_1
-test_answer_2 = 0
+test_answer_2 = 525152
 
 
 # ==== Template for running solutions ==== #
@@ -205,12 +171,10 @@ test_answer_2 = 0
 
 @timer
 def main():
-    start = time_ns()
     filename = 'input.txt'
     with open(filename, 'r') as f:
-        input = f.read()
-        delta = (time_ns() - start) / 1000000.0
-        print(f'Elapsed time of reading file: {delta} ms')
+        with span('reading file'):
+            input = f.read()
 
         for number in range(1, 3):
             func = globals()[f'solve_{number}']
@@ -6,10 +6,15 @@ import re
 import sys
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional, Tuple, Union, Dict, Set, Callable
+from typing import List, Optional, Tuple, Union, Dict, Set, Callable, Iterable
 from time import time_ns, sleep
 from functools import wraps, cache, cached_property, cmp_to_key
 from copy import copy
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from runner.inputs import iter_records, streaming
+from runner.instrumentation import span, timer
 
 
 # === Useful Functions === #
@@ -19,97 +24,70 @@ def splitlines(data: str, fun=lambda x: x) -> List[str]:
     return [fun(line) for line in data.splitlines() if line]
 
 
-def timer(f):
-    @wraps(f)
-    def wrapper(*args, **kwargs):
-        start = time_ns()
-        result = f(*args, **kwargs)
-        delta = (time_ns() - start) / 1000000.0
-        print(f'Elapsed time of {f.__name__}: {delta} ms')
-        return result
-
-    return wrapper
+# === Types === #
 
 
-# === Types === #
+@dataclass
+class Pattern:
+    # Every row and every column packed into an integer, '#' being a set bit.
+    rows: List[int]
+    cols: List[int]
 
 
 @dataclass
 class Input:
-    data: str
-    patterns: List[List[str]]
+    patterns: List[Pattern]
 
 
 # === Input parsing === #
 
 
+bits_table = str.maketrans('#.', '10')
+
+
+def encode_pattern(lines: List[str]) -> Pattern:
+    rows = [int(line.translate(bits_table), 2) for line in lines]
+    cols = [int(''.join(col).translate(bits_table), 2) for col in zip(*lines)]
+    return Pattern(rows, cols)
+
+
 @timer
-def parse_input(data: str, options: dict) -> Input:
-    patterns = []
-    lines = []
-    for line in data.splitlines():
-        if not line:
-            patterns.append(lines)
-            lines = []
-        else:
-            lines.append(line)
-    if lines:
-        patterns.append(lines)
-    return Input(data, patterns)
-
-
-def parse_input_1(data: str) -> Input:
-    return parse_input(data, options={})
+def parse_input(data: Union[str, Iterable[str]], options: dict) -> Input:
+    return Input([encode_pattern(lines) for lines in iter_records(data)])
 
 
-def parse_input_2(data: str) -> Input:
+@streaming
+def parse_input_1(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
-# === Solutions === #
+@streaming
+def parse_input_2(data: Union[str, Iterable[str]]) -> Input:
+    return parse_input(data, options={})
 
 
-def find_horizontal_reflection(lines: List[str], smudges: int = 0) -> int:
-    cols = len(lines[0])
-    rows = len(lines)
-    for row in range(1, rows):
-        height = min(row, rows - row)
-        wrongs = 0
-        for right_y in range(row, row + height):
-            left_y = row - (right_y - row) - 1
-            for x in range(0, cols):
-                if lines[right_y][x] != lines[left_y][x]:
-                    wrongs += 1
-                    if wrongs > smudges:
-                        break
-        if wrongs == smudges:
-            return row
-    return 0
+# === Solutions === #
 
 
-def find_vertical_reflection(lines: List[str], smudges: int = 0) -> int:
-    cols = len(lines[0])
-    rows = len(lines)
-    for col in range(1, cols):
-        width = min(col, cols - col)
+def find_reflection(masks: List[int], smudges: int = 0) -> int:
+    """Returns how many lines lie before the axis that mirrors with exactly `smudges` differences."""
+    count = len(masks)
+    for axis in range(1, count):
         wrongs = 0
-        for right_x in range(col, col + width):
-            left_x = col - (right_x - col) - 1
-            for y in range(0, rows):
-                if lines[y][right_x] != lines[y][left_x]:
-                    wrongs += 1
-                    if wrongs > smudges:
-                        break
+        for offset in range(0, min(axis, count - axis)):
+            wrongs += (masks[axis + offset] ^ masks[axis - offset - 1]).bit_count()
+            if wrongs > smudges:
+                break
         if wrongs == smudges:
-            return col
+            return axis
     return 0
 
 
 def solution(input: Input, smudges: int) -> int:
     sum = 0
     for pattern in input.patterns:
-        rows = find_horizontal_reflection(pattern, smudges)
-        cols = find_vertical_reflection(pattern, smudges)
+        rows = find_reflection(pattern.rows, smudges)
+        cols = find_reflection(pattern.cols, smudges)
         sum += rows * 100 + cols
     return sum
 
@@ -153,12 +131,10 @@ test_answer_2 = 400
 
 @timer
 def main():
-    start = time_ns()
     filename = 'input.txt'
     with open(filename, 'r') as f:
-        input = f.read()
-        delta = (time_ns() - start) / 1000000.0
-        print(f'Elapsed time of reading file: {delta} ms')
+        with span('reading file'):
+            input = f.read()
 
         for number in range(1, 3):
             func = globals()[f'solve_{number}']
@@ -5,7 +5,11 @@ import re
 import sys
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional, Tuple, Union, Dict, Set, Callable
+from typing import List, Optional, Tuple, Union, Dict, Set, Callable, Iterable
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from runner.inputs import iter_lines, streaming
 
 
 # === Useful Functions === #
@@ -44,7 +48,6 @@ class Game:
 
 @dataclass
 class Input:
-    lines: List[str]
     games: List[Game]
 
 
@@ -68,17 +71,18 @@ def parse_line(line: str) -> Game:
     return Game(int(result[1]), parse_sets(result[2]), line)
 
 
-def parse_input(data: str, options: dict) -> Input:
-    lines = splitlines(data)
-    games = [parse_line(line) for line in lines]
-    return Input(lines, games)
+def parse_input(data: Union[str, Iterable[str]], options: dict) -> Input:
+    games = [parse_line(line) for line in iter_lines(data)]
+    return Input(games)
 
 
-def parse_input1(data: str) -> Input:
+@streaming
+def parse_input1(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
-def parse_input2(data: str) -> Input:
+@streaming
+def parse_input2(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
@@ -8,6 +8,10 @@ from enum import Enum
 from typing import List, Optional, Tuple, Union, Dict, Set, Callable
 from functools import wraps, cached_property
 from time import time_ns
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from runner.instrumentation import timer
 
 
 # === Useful Functions === #
@@ -17,21 +21,6 @@ def splitlines(data: str, fun=lambda x: x) -> List[str]:
     return [fun(line) for line in data.splitlines() if line]
 
 
-def timer(f):
-    @wraps(f)
-    def wrapper(*args, **kwargs):
-        start = time_ns()
-        result = f(*args, **kwargs)
-        delta = (time_ns() - start) / 1000000.0
-        print(f'Elapsed time of {f.__name__}: {delta} ms')
-        return result
-
-    return wrapper
-
-
-DIGITS = '1234567890'
-
-
 # === Types === #
 
 
@@ -65,56 +54,47 @@ class Input:
     height: int
     part_numbers: List[PartNumber]
     symbols: List[Symbol]
+    # Index into part_numbers for every cell covered by a part number, -1 elsewhere.
+    labels: np.ndarray
 
 
 # === Input parsing === #
 
 
+def dilate(mask: np.ndarray) -> np.ndarray:
+    # Marks every cell that has a marked cell among its eight neighbours or itself.
+    height, width = mask.shape
+    padded = np.pad(mask, 1)
+    result = np.zeros_like(mask)
+    for dy in range(0, 3):
+        for dx in range(0, 3):
+            result |= padded[dy:dy + height, dx:dx + width]
+    return result
+
+
 @timer
 def parse_input(data: str, options: dict) -> Input:
     lines = splitlines(data)
     width = len(lines[0])
     height = len(lines)
 
-    def is_part_number(start_x, x, y, verbose: bool = False) -> bool:
-        if verbose:
-            print('verbose')
-            print(start_x, x, y)
-        for _y in range(max(0, y - 1), min(y + 2, height)):
-            for _x in range(max(0, start_x - 1), min(x + 1, width)):
-                _val = lines[_y][_x]
-                if _val not in DIGITS and _val != '.':
-                    return True
-        return False
+    grid = np.frombuffer(''.join(lines).encode(), dtype=np.uint8).reshape(height, width)
+    is_digit = (grid >= ord('0')) & (grid <= ord('9'))
+    is_symbol = ~is_digit & (grid != ord('.'))
+    near_symbol = dilate(is_symbol)
 
     part_numbers = []
-    symbols = []
-
-    y = 0
-    while y < height:
-        x = 0
-        start_x = x
-        digit = ''
-        while x < width:
-            val = lines[y][x]
-
-            if val not in DIGITS and val != '.':
-                symbols.append(Symbol(x, y, val))
-
-            if val in DIGITS:
-                if digit == '':
-                    start_x = x
-                digit += val
-            if val not in DIGITS or x == width - 1:
-                # Number has ended.
-                if digit:
-                    if is_part_number(start_x, x, y):
-                        part_numbers.append(PartNumber(start_x, x if val in DIGITS else x - 1, y, int(digit)))
-                    digit = ''
-            x += 1
-        y += 1
-
-    return Input(lines, width, height, part_numbers, symbols)
+    labels = np.full((height, width), -1, dtype=np.int32)
+    for y, line in enumerate(lines):
+        for match in re.finditer(r'\d+', line):
+            start_x, end_x = match.span()
+            if near_symbol[y, start_x:end_x].any():
+                labels[y, start_x:end_x] = len(part_numbers)
+                part_numbers.append(PartNumber(start_x, end_x - 1, y, int(match[0])))
+
+    symbols = [Symbol(x, y, lines[y][x]) for y, x in zip(*np.nonzero(is_symbol))]
+
+    return Input(lines, width, height, part_numbers, symbols, labels)
 
 
 def parse_input1(data: str) -> Input:
@@ -138,17 +118,14 @@ def solve1(input: Input) -> Optional[int]:
 
 @timer
 def solve2(input: Input) -> Optional[int]:
-    width = input.width
-    height = input.height
-    stars = [symbol for symbol in input.symbols if symbol.is_star]
     sum = 0
-    for star in stars:
-        adjacent_part_numbers = []
-        for part in input.part_numbers:
-            if max(0, part.start_x - 1) <= star.x <= min(part.end_x + 1, width - 1) and max(0, part.y - 1) <= star.y <= min(part.y + 1, height - 1):
-                adjacent_part_numbers.append(part.value)
-        if len(adjacent_part_numbers) == 2:
-            sum += adjacent_part_numbers[0] * adjacent_part_numbers[1]
+    for star in input.symbols:
+        if not star.is_star:
+            continue
+        around = input.labels[max(0, star.y - 1):star.y + 2, max(0, star.x - 1):star.x + 2]
+        adjacent = np.unique(around[around >= 0])
+        if len(adjacent) == 2:
+            sum += input.part_numbers[adjacent[0]].value * input.part_numbers[adjacent[1]].value
     return sum
 
 
@@ -5,9 +5,15 @@ import re
 import sys
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional, Tuple, Union, Dict, Set, Callable
+from typing import List, Optional, Tuple, Union, Dict, Set, Callable, Iterable
 from time import time_ns
-from functools import wraps, cache
+from functools import wraps, cache, reduce
+from operator import or_
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from runner.inputs import iter_lines, streaming
+from runner.instrumentation import timer
 
 
 # === Useful Functions === #
@@ -17,61 +23,52 @@ def splitlines(data: str, fun=lambda x: x) -> List[str]:
     return [fun(line) for line in data.splitlines() if line]
 
 
-def timer(f):
-    @wraps(f)
-    def wrapper(*args, **kwargs):
-        start = time_ns()
-        result = f(*args, **kwargs)
-        delta = (time_ns() - start) / 1000000.0
-        print(f'Elapsed time of {f.__name__}: {delta} ms')
-        return result
-
-    return wrapper
-
-
 # === Types === #
 
 
 @dataclass
 class Card:
     id: int
-    winning_numbers: List[int]
-    numbers_got: List[int]
+    # Bit n is set when number n (always below 100) is on the card.
+    winning_numbers: int
+    numbers_got: int
     line: str
 
 
 @dataclass
 class Input:
-    lines: List[str]
     cards: List[Card]
 
 
 # === Input parsing === #
 
 
+NUMBER_BITS = {str(n): 1 << n for n in range(0, 100)}
+
+
+def to_bitset(numbers: str) -> int:
+    return reduce(or_, map(NUMBER_BITS.__getitem__, numbers.split()), 0)
+
+
 def parse_line(line: str) -> Card:
-    regex = r"Card +(\d+): (.+) \| (.+)"
-    result = re.match(regex, line)
-    return Card(
-        int(result[1]),
-        [int(n.strip()) for n in re.sub(r' +', ' ', result[2].strip()).split(' ')],
-        [int(n.strip()) for n in re.sub(r' +', ' ', result[3].strip()).split(' ')],
-        line
-    )
+    header, _, numbers = line.partition(':')
+    winning, _, got = numbers.partition('|')
+    return Card(int(header[4:]), to_bitset(winning), to_bitset(got), line)
 
 
 @timer
-def parse_input(data: str, options: dict) -> Input:
-    lines = splitlines(data)
-    cards = [parse_line(line) for line in lines]
-    return Input(lines, cards)
+def parse_input(data: Union[str, Iterable[str]], options: dict) -> Input:
+    cards = [parse_line(line) for line in iter_lines(data)]
+    return Input(cards)
 
 
-def parse_input1(data: str) -> Input:
+@streaming
+def parse_input1(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
-def parse_input2(data: str) -> Input:
+@streaming
+def parse_input2(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
@@ -79,11 +76,7 @@ def parse_input2(data: str) -> Input:
 
 
 def count_winners(card: Card) -> int:
-    winners = 0
-    for num in card.winning_numbers:
-        if num in card.numbers_got:
-            winners += 1
-    return winners
+    return (card.winning_numbers & card.numbers_got).bit_count()
 
 
 @timer
@@ -92,21 +85,25 @@ def solve1(input: Input) -> Optional[int]:
     for card in input.cards:
         winners = count_winners(card)
         if winners:
-            sum += pow(2, winners - 1)
+            sum += 1 << (winners - 1)
     return sum
 
 
 @timer
 def solve2(input: Input) -> Optional[int]:
+    # Each card adds its copies to a range of following cards. The ranges are
+    # kept as a difference array whose running sum is the current card's count.
+    count = len(input.cards)
+    changes = [0] * (count + 1)
+    copies = 1
     sum = 0
-    extra_cards = {}
-    for card in input.cards:
-        extra = extra_cards.get(card.id, 0)
+    for idx, card in enumerate(input.cards):
+        copies += changes[idx]
+        sum += copies
         winners = count_winners(card)
         if winners:
-            for idx in range(card.id + 1, card.id + 1 + winners):
-                extra_cards[idx] = extra_cards.get(idx, 0) + 1 + extra
-        sum += 1 + extra
+            changes[idx + 1] += copies
+            changes[min(idx + 1 + winners, count)] -= copies
     return sum
 
 
@@ -3,12 +3,17 @@ from __future__ import annotations
 import numpy as np
 import re
 import sys
+from bisect import bisect_right
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional, Tuple, Union, Dict, Set, Callable
+from typing import List, Optional, Tuple, Union, Dict, Set, Callable, Iterable
 from time import time_ns
 from functools import wraps, cache, cached_property
-from copy import copy
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from runner.inputs import iter_lines, streaming
+from runner.instrumentation import timer
 
 
 # === Useful Functions === #
@@ -18,18 +23,6 @@ def splitlines(data: str, fun=lambda x: x) -> List[str]:
     return [fun(line) for line in data.splitlines() if line]
 
 
-def timer(f):
-    @wraps(f)
-    def wrapper(*args, **kwargs):
-        start = time_ns()
-        result = f(*args, **kwargs)
-        delta = (time_ns() - start) / 1000000.0
-        print(f'Elapsed time of {f.__name__}: {delta} ms')
-        return result
-
-    return wrapper
-
-
 # === Types === #
 
 
@@ -40,16 +33,6 @@ class Range:
     length: int
 
 
-@dataclass
-class Vector:
-    start: int
-    length: int
-
-    @cached_property
-    def end(self) -> int:
-        return self.start + self.length - 1
-
-
 @dataclass
 class Transformer:
     fr: str
@@ -57,25 +40,35 @@ class Transformer:
     ranges: List[Range]
 
 
+@dataclass
+class IntervalMap:
+    # Segment i covers [starts[i], starts[i + 1]) and shifts values by offsets[i].
+    # The first segment starts at -inf, the last one runs to +inf.
+    starts: List[int]
+    offsets: List[int]
+
+
 @dataclass
 class Input:
-    lines: List[str]
     seeds: List[int]
     maps: List[Transformer]
 
+    @cached_property
+    def pipeline(self) -> IntervalMap:
+        return compile_pipeline(self.maps, 'seed', 'location')
+
 
 # === Input parsing === #
 
 
 @timer
-def parse_input(data: str, options: dict) -> Input:
-    lines = splitlines(data)
-    result = re.match(r'seeds: (.+)', lines[0])
+def parse_input(data: Union[str, Iterable[str]], options: dict) -> Input:
+    lines = iter_lines(data)
+    result = re.match(r'seeds: (.+)', next(lines))
     seeds = [int(s.strip()) for s in result[1].split(' ') if s]
     maps = []
     just_started = True
-    for idx in range(1, len(lines)):
-        line = lines[idx]
+    for line in lines:
         if 'map' in line:
             if just_started:
                 just_started = False
@@ -90,144 +83,134 @@ def parse_input(data: str, options: dict) -> Input:
         parts = [int(p.strip()) for p in line.split(' ') if p]
         ranges.append(Range(parts[0], parts[1], parts[2]))
     maps.append(Transformer(fr, to, ranges))
-    return Input(lines, seeds, maps)
+    return Input(seeds, maps)
 
 
-def parse_input1(data: str) -> Input:
+@streaming
+def parse_input1(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
-def parse_input2(data: str) -> Input:
+@streaming
+def parse_input2(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
 # === Solutions === #
 
 
-def map_value(map: Transformer, value: int) -> int:
-    for range in map.ranges:
-        if range.source <= value <= range.source + range.length:
-            return range.destination + value - range.source
-    return value
-
-
-def intersect(v1: Vector, v2: Vector) -> Optional[Vector]:
-    if v1.start >= v2.start and v1.end <= v2.end:
-        return copy(v1)
-    if v2.start >= v1.start and v2.end <= v1.end:
-        return copy(v2)
-    if v1.end < v2.start or v1.start > v2.end:
-        return None
-    # v1 left to v2
-    if v1.start < v2.start <= v1.end < v2.end:
-        start = v2.start
-        end = v1.end
-        return Vector(start, end - start + 1)
-    # v2 left to v2
-    if v2.start < v1.start <= v2.end < v1.end:
-        start = v1.start
-        end = v2.end
-        return Vector(start, end - start + 1)
-    raise ValueError(f"Uncounted for leaf. v1 = {v1, v1.end}, v2 = {v2, v2.end}")
-
-
-def sort_vectors(vectors: List[Vector]) -> List[Vector]:
-    return sorted(vectors, key=lambda v: v.start)
-
-
-def sum_vectors(vectors: List[Vector]) -> int:
-    sum = 0
-    for vector in vectors:
-        sum += vector.length
-    return sum
+def build_interval_map(map: Transformer) -> IntervalMap:
+    segments = [(-sys.maxsize, 0)]
+    for _range in sorted(map.ranges, key=lambda r: r.source):
+        if _range.source < segments[-1][0]:
+            raise ValueError(f'Overlapping ranges in {map.fr}-to-{map.to} map: {_range}')
+        segments.append((_range.source, _range.destination - _range.source))
+        segments.append((_range.source + _range.length, 0))
+    return merge_segments(segments)
+
+
+def merge_segments(segments: List[Tuple[int, int]]) -> IntervalMap:
+    starts = []
+    offsets = []
+    for start, offset in segments:
+        if starts and starts[-1] == start:
+            offsets[-1] = offset
+        elif not offsets or offsets[-1] != offset:
+            starts.append(start)
+            offsets.append(offset)
+    return IntervalMap(starts, offsets)
+
+
+def compose(first: IntervalMap, second: IntervalMap) -> IntervalMap:
+    """Returns the map equal to applying first and then second."""
+    starts = second.starts
+    count = len(starts)
+    segments = []
+    for idx in range(0, len(first.starts)):
+        start = first.starts[idx]
+        end = first.starts[idx + 1] if idx + 1 < len(first.starts) else None
+        offset = first.offsets[idx]
+        jdx = max(0, bisect_right(starts, start + offset) - 1)
+        while True:
+            segments.append((start, offset + second.offsets[jdx]))
+            if jdx + 1 == count:
+                break
+            start = starts[jdx + 1] - offset
+            if end is not None and start >= end:
+                break
+            jdx += 1
+    return merge_segments(segments)
+
+
+def compile_pipeline(maps: List[Transformer], fr: str, to: str) -> IntervalMap:
+    transformers = {map.fr: map for map in maps}
+    pipeline = merge_segments([(-sys.maxsize, 0)])
+    category = fr
+    while category != to:
+        map = transformers[category]
+        pipeline = compose(pipeline, build_interval_map(map))
+        category = map.to
+    return pipeline
+
+
+def map_value(imap: IntervalMap, value: int) -> int:
+    return value + imap.offsets[bisect_right(imap.starts, value) - 1]
+
+
+def map_values(imap: IntervalMap, values: np.ndarray) -> np.ndarray:
+    starts = np.asarray(imap.starts, dtype=np.int64)
+    offsets = np.asarray(imap.offsets, dtype=np.int64)
+    return values + offsets[np.searchsorted(starts, values, side='right') - 1]
+
+
+def coalesce(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    output = []
+    for start, end in sorted(intervals):
+        if output and start <= output[-1][1]:
+            if end > output[-1][1]:
+                output[-1] = (output[-1][0], end)
+        else:
+            output.append((start, end))
+    return output
 
 
-def map_vector(map: Transformer, vector: Vector) -> List[Vector]:
+def map_intervals(imap: IntervalMap, intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Maps sorted, disjoint half-open intervals in one merge pass over the segments."""
+    starts = imap.starts
+    offsets = imap.offsets
+    count = len(starts)
     output = []
-    mapped_vector = []
-    for _range in map.ranges:
-        source = intersect(Vector(_range.source, _range.length), vector)
-        if source is None:
-            continue
-        mapped_vector.append(source)
-        output.append(Vector(_range.destination + source.start - _range.source, source.length))
-    if not output:
-        return [vector]
-
-    total_length = sum_vectors(output)
-    if vector.length == total_length:
-        return output
-
-    if vector.length < total_length:
-        raise ValueError('Mapped vectors are too large.')
-
-    mapped_vector = sort_vectors(mapped_vector)
-
-    if mapped_vector[0].start > vector.start:
-        start = vector.start
-        end = mapped_vector[0].start - 1
-        _v = Vector(start, end - start + 1)
-        output.append(_v)
-
-    for idx in range(1, len(mapped_vector)):
-        prev = mapped_vector[idx - 1]
-        curr = mapped_vector[idx]
-        start = prev.end + 1
-        end = curr.start - 1
-        length = end - start + 1
-        if length > 0:
-            output.append(Vector(start, length))
-
-    last_idx = len(mapped_vector) - 1
-    if mapped_vector[last_idx].end < vector.end:
-        start = mapped_vector[last_idx].end + 1
-        end = vector.end
-        output.append(Vector(start, end - start + 1))
-
-    total_length = sum_vectors(output)
-    if vector.length != total_length:
-        raise ValueError(f'Total output is incorrect. Vector = {vector}, output = {output}')
-
-    return output
+    idx = 0
+    for start, end in intervals:
+        if idx + 1 < count and starts[idx + 1] <= start:
+            idx = bisect_right(starts, start, idx) - 1
+        while start < end:
+            segment_end = starts[idx + 1] if idx + 1 < count else end
+            chunk_end = min(end, segment_end)
+            offset = offsets[idx]
+            output.append((start + offset, chunk_end + offset))
+            start = chunk_end
+            if start == segment_end and idx + 1 < count:
+                idx += 1
+    return coalesce(output)
 
 
 @timer
 def solve1(input: Input) -> Optional[int]:
-    location = None
-    for seed in input.seeds:
-        category = 'seed'
-        value = seed
-        while category != 'location':
-            for map in input.maps:
-                if map.fr != category:
-                    continue
-                value = map_value(map, value)
-                category = map.to
-        if location is None or location > value:
-            location = value
-    return location
+    if not input.seeds:
+        return None
+    seeds = np.asarray(input.seeds, dtype=np.int64)
+    return int(map_values(input.pipeline, seeds).min())
 
 
 @timer
 def solve2(input: Input) -> Optional[int]:
-    location = None
-    for s in range(0, len(input.seeds) // 2):
-        left = input.seeds[s * 2]
-        right = input.seeds[s * 2 + 1]
-        seed = Vector(left, right)
-        values = [seed]
-        for map in input.maps:
-            new_values = []
-            for value in values:
-                _values = map_vector(map, value)
-                for _value in _values:
-                    new_values.append(_value)
-            values = new_values
-        sorted_values = sort_vectors(values)
-        value = sorted_values[0].start
-        if location is None or location > value:
-            location = value
-    return location
+    intervals = coalesce([(input.seeds[s], input.seeds[s] + input.seeds[s + 1])
+                          for s in range(0, len(input.seeds) - 1, 2)])
+    intervals = map_intervals(input.pipeline, intervals)
+    if not intervals:
+        return None
+    return intervals[0][0]
 
 
 # ==== Solutions with test data ==== #
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import numpy as np
+import math
 import re
 import sys
 from dataclasses import dataclass
@@ -9,6 +10,10 @@ from typing import List, Optional, Tuple, Union, Dict, Set, Callable
 from time import time_ns
 from functools import wraps, cache, cached_property
 from copy import copy
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from runner.instrumentation import timer
 
 
 # === Useful Functions === #
@@ -18,18 +23,6 @@ def splitlines(data: str, fun=lambda x: x) -> List[str]:
     return [fun(line) for line in data.splitlines() if line]
 
 
-def timer(f):
-    @wraps(f)
-    def wrapper(*args, **kwargs):
-        start = time_ns()
-        result = f(*args, **kwargs)
-        delta = (time_ns() - start) / 1000000.0
-        print(f'Elapsed time of {f.__name__}: {delta} ms')
-        return result
-
-    return wrapper
-
-
 # === Types === #
 
 
@@ -72,31 +65,46 @@ def parse_input2(data: str) -> Input:
 # === Solutions === #
 
 
-def find_winners(time: int, dist: int) -> List[Tuple[int, int]]:
-    winners = []
-    for t in range(0, time + 1):
-        remaining_t = time - t
-        d = remaining_t * t
-        if d > dist:
-            winners.append((t, d))
-    return winners
+def count_winners(time: int, dist: int) -> int:
+    """Counts hold times t with t * (time - t) > dist, from the integer roots of the quadratic."""
+    disc = time * time - 4 * dist
+    if disc <= 0:
+        return 0
+    lo = max(0, (time - math.isqrt(disc)) // 2)
+    # isqrt rounds down, so the first winning hold time is at most a step away.
+    while lo * (time - lo) <= dist:
+        lo += 1
+        if lo > time // 2:
+            # With an odd time and disc == 1 the roots lie between two integers.
+            return 0
+    while lo > 0 and (lo - 1) * (time - lo + 1) > dist:
+        lo -= 1
+    return max(0, time - 2 * lo + 1)
+
+
+def count_winners_batch(times: np.ndarray, dists: np.ndarray) -> np.ndarray:
+    """Vectorized count_winners for many races; products must fit into int64."""
+    times = np.asarray(times, dtype=np.int64)
+    dists = np.asarray(dists, dtype=np.int64)
+    disc = times * times - 4 * dists
+    roots = np.floor(np.sqrt(np.maximum(disc, 0))).astype(np.int64)
+    lo = np.maximum(0, (times - roots) // 2)
+    # Floating point roots may be off by one in either direction.
+    for _ in range(2):
+        lo = np.where(lo * (times - lo) <= dists, lo + 1, lo)
+    for _ in range(2):
+        lo = np.where((lo > 0) & ((lo - 1) * (times - lo + 1) > dists), lo - 1, lo)
+    return np.where(disc > 0, np.maximum(0, times - 2 * lo + 1), 0)
 
 
 @timer
 def solve1(input: Input) -> Optional[int]:
-    answer = 1
-    for idx in range(0, len(input.times)):
-        time = input.times[idx]
-        dist = input.distances[idx]
-        winners = find_winners(time, dist)
-        answer *= len(winners)
-    return answer
+    return math.prod(int(count) for count in count_winners_batch(input.times, input.distances))
 
 
 @timer
 def solve2(input: Input) -> Optional[int]:
-    winners = find_winners(input.time, input.distance)
-    return len(winners)
+    return count_winners(input.time, input.distance)
 
 
 # ==== Solutions with test data ==== #
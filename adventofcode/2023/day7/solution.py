@@ -5,10 +5,15 @@ import re
 import sys
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional, Tuple, Union, Dict, Set, Callable
+from typing import List, Optional, Tuple, Union, Dict, Set, Callable, Iterable
 from time import time_ns
 from functools import wraps, cache, cached_property, cmp_to_key
 from copy import copy
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from runner.inputs import iter_lines, streaming
+from runner.instrumentation import span, timer
 
 
 # === Useful Functions === #
@@ -18,18 +23,6 @@ def splitlines(data: str, fun=lambda x: x) -> List[str]:
     return [fun(line) for line in data.splitlines() if line]
 
 
-def timer(f):
-    @wraps(f)
-    def wrapper(*args, **kwargs):
-        start = time_ns()
-        result = f(*args, **kwargs)
-        delta = (time_ns() - start) / 1000000.0
-        print(f'Elapsed time of {f.__name__}: {delta} ms')
-        return result
-
-    return wrapper
-
-
 # === Types === #
 
 
@@ -51,7 +44,6 @@ class Hand:
 
 @dataclass
 class Input:
-    lines: List[str]
     hands: List[Hand]
 
 
@@ -59,22 +51,22 @@ class Input:
 
 
 @timer
-def parse_input(data: str, options: dict) -> Input:
-    lines = splitlines(data)
-
+def parse_input(data: Union[str, Iterable[str]], options: dict) -> Input:
     hands = []
-    for line in lines:
+    for line in iter_lines(data):
         parts = line.split(' ')
         hands.append(Hand(parts[0], int(parts[1])))
 
-    return Input(lines, hands)
+    return Input(hands)
 
 
-def parse_input1(data: str) -> Input:
+@streaming
+def parse_input1(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
-def parse_input2(data: str) -> Input:
+@streaming
+def parse_input2(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
@@ -89,26 +81,50 @@ CARD_ORDER_WITH_JOKER = ['A', 'K', 'Q', 'T', '9', '8', '7', '6', '5', '4', '3',
 CARD_ORDER_WITH_JOKER.reverse()
 
 
-@cache
+COMBINATIONS = {
+    (5,): CardCombination.five_of_a_kind,
+    (4, 1): CardCombination.four_of_a_kind,
+    (3, 2): CardCombination.full_house,
+    (3, 1, 1): CardCombination.three_of_a_kind,
+    (2, 2, 1): CardCombination.two_pair,
+    (2, 1, 1, 1): CardCombination.one_pair,
+    (1, 1, 1, 1, 1): CardCombination.high_card,
+}
+
+
+def count_signatures(total: int, largest: int) -> List[Tuple[int, ...]]:
+    # Every way to split `total` cards into groups of at most `largest`, largest group first.
+    if total == 0:
+        return [()]
+    return [(first,) + rest
+            for first in range(min(total, largest), 0, -1)
+            for rest in count_signatures(total - first, first)]
+
+
+def build_joker_table() -> Dict[Tuple[int, ...], CardCombination]:
+    # Maps the group sizes of the other cards plus a trailing joker count to the
+    # best combination: jokers always go to the largest group.
+    table = {}
+    for jokers in range(0, 6):
+        for groups in count_signatures(5 - jokers, 5):
+            best = (groups[0] + jokers,) + groups[1:] if groups else (jokers,)
+            table[groups + (jokers,)] = COMBINATIONS[best]
+    return table
+
+
+JOKER_TABLE = build_joker_table()
+
+
+def count_signature(cards: str) -> Tuple[int, ...]:
+    return tuple(sorted((cards.count(c) for c in set(cards)), reverse=True))
+
+
 def cards_combination(cards: str) -> CardCombination:
-    d = {}
-    for c in cards:
-        d[c] = d.get(c, 0) + 1
-    groups = sorted(list(d.values()), reverse=True)
-
-    if groups == [5]:
-        return CardCombination.five_of_a_kind
-    if groups == [4, 1]:
-        return CardCombination.four_of_a_kind
-    if groups == [3, 2]:
-        return CardCombination.full_house
-    if groups == [3, 1, 1]:
-        return CardCombination.three_of_a_kind
-    if groups == [2, 2, 1]:
-        return CardCombination.two_pair
-    if groups == [2, 1, 1, 1]:
-        return CardCombination.one_pair
-    return CardCombination.high_card
+    return COMBINATIONS[count_signature(cards)]
+
+
+def cards_combination_with_joker(cards: str) -> CardCombination:
+    return JOKER_TABLE[count_signature(cards.replace('J', '')) + (cards.count('J'),)]
 
 
 def hand_combination(hand: Hand) -> CardCombination:
@@ -116,56 +132,47 @@ def hand_combination(hand: Hand) -> CardCombination:
 
 
 def hand_combination_with_joker(hand: Hand) -> CardCombination:
-    if 'J' not in hand.cards:
-        return hand_combination(hand)
-    max_combination = cards_combination(hand.cards)
-    for c in hand.cards:
-        if c == 'J':
-            continue
-        result = cards_combination(hand.cards.replace('J', c))
-        if result.value > max_combination.value:
-            max_combination = result
-    return max_combination
+    return cards_combination_with_joker(hand.cards)
+
+
+CARD_VALUES = {c: idx for idx, c in enumerate(CARD_ORDER)}
+CARD_VALUES_WITH_JOKER = {c: idx for idx, c in enumerate(CARD_ORDER_WITH_JOKER)}
 
 
-def generic_compare(h1: Hand, h2: Hand, card_order: List[str], result) -> int:
-    r1 = result(h1)
-    r2 = result(h2)
-    if r1.value != r2.value:
-        return (r1.value - r2.value) * 100
-    for idx in range(0, 5):
-        c1 = h1.cards[idx]
-        c2 = h2.cards[idx]
-        i1 = card_order.index(c1)
-        i2 = card_order.index(c2)
-        if i1 != i2:
-            return i1 - i2
-    return 0
+def cards_key(cards: str, card_values: Dict[str, int], combination: CardCombination) -> int:
+    # Combination rank followed by the five cards as base-13 digits, so plain
+    # integer order is the same as the game's order.
+    key = combination.value
+    for c in cards:
+        key = key * 13 + card_values[c]
+    return key
 
 
-def compare(h1: Hand, h2: Hand) -> int:
-    return generic_compare(h1, h2, CARD_ORDER, hand_combination)
+@cache
+def hand_key(cards: str) -> int:
+    return cards_key(cards, CARD_VALUES, cards_combination(cards))
 
 
-def compare_with_joker(h1: Hand, h2: Hand) -> int:
-    return generic_compare(h1, h2, CARD_ORDER_WITH_JOKER, hand_combination_with_joker)
+@cache
+def hand_key_with_joker(cards: str) -> int:
+    return cards_key(cards, CARD_VALUES_WITH_JOKER, cards_combination_with_joker(cards))
 
 
-def total_winnings(hands: List[Hand]) -> int:
-    winning_power = 0
-    for idx in range(0, len(hands)):
-        winning_power += (idx + 1) * hands[idx].bid
-    return winning_power
+def total_winnings(hands: List[Hand], key: Callable[[str], int]) -> int:
+    keys = np.fromiter((key(hand.cards) for hand in hands), dtype=np.int64, count=len(hands))
+    bids = np.fromiter((hand.bid for hand in hands), dtype=np.int64, count=len(hands))
+    order = np.argsort(keys, kind='stable')
+    return int(np.dot(bids[order], np.arange(1, len(hands) + 1)))
 
 
 @timer
 def solve1(input: Input) -> Optional[int]:
-    return total_winnings(sorted(input.hands, key=cmp_to_key(compare)))
+    return total_winnings(input.hands, hand_key)
 
 
 @timer
 def solve2(input: Input) -> Optional[int]:
-    return total_winnings(sorted(input.hands, key=cmp_to_key(compare_with_joker)))
+    return total_winnings(input.hands, hand_key_with_joker)
 
 
 # ==== Solutions with test data ==== #
@@ -194,12 +201,10 @@ solves = [
 
 @timer
 def main():
-    start = time_ns()
     filename = 'input.txt'
     with open(filename, 'r') as f:
-        input = f.read()
-        delta = (time_ns() - start) / 1000000.0
-        print(f'Elapsed time of reading file: {delta} ms')
+        with span('reading file'):
+            input = f.read()
 
         number = 1
         for solve in solves:
@@ -6,10 +6,15 @@ import re
 import sys
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional, Tuple, Union, Dict, Set, Callable
+from typing import List, Optional, Tuple, Union, Dict, Set, Callable, Iterable
 from time import time_ns
 from functools import wraps, cache, cached_property, cmp_to_key
 from copy import copy
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from runner.inputs import iter_lines, streaming
+from runner.instrumentation import span, timer
 
 
 # === Useful Functions === #
@@ -19,30 +24,47 @@ def splitlines(data: str, fun=lambda x: x) -> List[str]:
     return [fun(line) for line in data.splitlines() if line]
 
 
-def timer(f):
-    @wraps(f)
-    def wrapper(*args, **kwargs):
-        start = time_ns()
-        result = f(*args, **kwargs)
-        delta = (time_ns() - start) / 1000000.0
-        print(f'Elapsed time of {f.__name__}: {delta} ms')
-        return result
+# === Types === #
 
-    return wrapper
 
+@dataclass
+class Network:
+    # Nodes are numbered in input order, `moves[0]` holds left and
+    # `moves[1]` right neighbours by node id.
+    names: List[str]
+    moves: Tuple[List[int], List[int]]
 
-# === Types === #
+    @cached_property
+    def ids(self) -> Dict[str, int]:
+        return {name: idx for idx, name in enumerate(self.names)}
 
 
 @dataclass
-class Loop:
-    locations: List[str]
-    done: bool
+class JumpTable:
+    # after[k][node] is the node reached by 2^k full passes of the
+    # instructions, reaches[k][node] tells whether those passes visit an end node.
+    length: int
+    after: List[List[int]]
+    reaches: List[List[bool]]
+
+
+@dataclass
+class Ghost:
+    # Steps at which the ghost stands on an end node: `prefix` before its
+    # walk becomes periodic at `start`, `hits` during the first period.
+    prefix: List[int]
+    start: int
+    period: int
+    hits: List[int]
+
+    def is_end(self, steps: int) -> bool:
+        if steps < self.start:
+            return steps in self.prefix
+        return self.start + (steps - self.start) % self.period in self.hits
 
 
 @dataclass
 class Input:
-    lines: List[str]
     instructions: str
     map: Dict[str, Tuple[str, str]]
     starting_locations: List[str]
@@ -52,25 +74,35 @@ class Input:
 
 
 @timer
-def parse_input(data: str, options: dict) -> Input:
-    lines = splitlines(data)
+def parse_input(data: Union[str, Iterable[str]], options: dict) -> Input:
+    lines = iter_lines(data)
+    instructions = next(lines)
     map = {}
     starting_locations = []
-    for idx in range(1, len(lines)):
-        line = lines[idx]
+    for line in lines:
         result = re.match(r'(\w+) = \((\w+), (\w+)\)', line)
         map[result[1]] = (result[2], result[3])
         if result[1][2] == 'A':
             starting_locations.append(result[1])
 
-    return Input(lines, lines[0], map, starting_locations)
+    return Input(instructions, map, starting_locations)
 
 
-def parse_input_1(data: str) -> Input:
+def compile_network(map: Dict[str, Tuple[str, str]]) -> Network:
+    names = list(map)
+    ids = {name: idx for idx, name in enumerate(names)}
+    left = [ids[map[name][0]] for name in names]
+    right = [ids[map[name][1]] for name in names]
+    return Network(names, (left, right))
+
+
+@streaming
+def parse_input_1(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
-def parse_input_2(data: str) -> Input:
+@streaming
+def parse_input_2(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
@@ -80,69 +112,129 @@ def parse_input_2(data: str) -> Input:
 instruction_map = {'L': 0, 'R': 1}
 
 
+def pass_transitions(network: Network, instructions: str, ends: List[bool]) -> Tuple[List[int], List[List[int]]]:
+    """For every node returns where one full pass of instructions leads and at which steps it passes end nodes."""
+    moves = [network.moves[instruction_map[i]] for i in instructions]
+    after = []
+    hits = []
+    for node in range(len(network.names)):
+        node_hits = []
+        for step, move in enumerate(moves, start=1):
+            node = move[node]
+            if ends[node]:
+                node_hits.append(step)
+        after.append(node)
+        hits.append(node_hits)
+    return after, hits
+
+
+def extend_jump_table(table: JumpTable, levels: int):
+    while len(table.after) < levels:
+        after = table.after[-1]
+        reaches = table.reaches[-1]
+        table.after.append([after[node] for node in after])
+        table.reaches.append([reaches[node] or reaches[after[node]] for node in range(len(after))])
+
+
+def build_jump_table(after: List[int], hits: List[List[int]], length: int) -> JumpTable:
+    table = JumpTable(length, [after], [[bool(node_hits) for node_hits in hits]])
+    # A walk is periodic after as many passes as there are nodes, so that many
+    # passes are enough to tell whether it ever visits an end node.
+    extend_jump_table(table, len(after).bit_length() + 1)
+    return table
+
+
+def position_after(network: Network, instructions: str, table: JumpTable, node: int, steps: int) -> int:
+    """Returns the node reached after `steps` steps in O(log(steps) + len(instructions))."""
+    passes, rest = divmod(steps, table.length)
+    extend_jump_table(table, passes.bit_length())
+    level = 0
+    while passes:
+        if passes & 1:
+            node = table.after[level][node]
+        passes >>= 1
+        level += 1
+    for instruction in instructions[:rest]:
+        node = network.moves[instruction_map[instruction]][node]
+    return node
+
+
+def first_end(table: JumpTable, hits: List[List[int]], node: int) -> Optional[int]:
+    """Returns the number of steps until the walk from `node` first visits an end node."""
+    passes = 0
+    if not table.reaches[0][node]:
+        # Skip the largest runs of passes that don't visit an end node.
+        for level in range(len(table.after) - 1, -1, -1):
+            if not table.reaches[level][node]:
+                node = table.after[level][node]
+                passes += 1 << level
+        if not hits[node]:
+            return None
+    return passes * table.length + hits[node][0]
+
+
 @timer
 def solve_1(input: Input) -> Optional[int]:
-    idx = 0
-    location = 'AAA'
-    map = input.map
-    steps = 0
-    while location != 'ZZZ':
-        instruction = instruction_map[input.instructions[idx]]
-        location = map[location][instruction]
-        idx += 1
-        steps += 1
-        if idx == len(input.instructions):
-            idx = 0
-    return steps
-
-
-def is_end(locations: List[str]) -> bool:
-    for loc in locations:
-        if loc[2] != 'Z':
-            return False
-    return True
+    network = compile_network(input.map)
+    ends = [name == 'ZZZ' for name in network.names]
+    after, hits = pass_transitions(network, input.instructions, ends)
+    table = build_jump_table(after, hits, len(input.instructions))
+    return first_end(table, hits, network.ids['AAA'])
+
+
+def trace_ghost(start: int, after: List[int], hits: List[List[int]], length: int) -> Ghost:
+    # Pass boundaries repeat after at most one visit of every node.
+    seen = {}
+    times = []
+    node = start
+    passes = 0
+    while node not in seen:
+        seen[node] = passes
+        times.extend(passes * length + step for step in hits[node])
+        node = after[node]
+        passes += 1
+    cycle_start = seen[node] * length
+    period = (passes - seen[node]) * length
+    return Ghost([t for t in times if t < cycle_start], cycle_start, period, [t for t in times if t >= cycle_start])
+
+
+def combine(r1: int, m1: int, r2: int, m2: int) -> Optional[Tuple[int, int]]:
+    """Solves t = r1 (mod m1), t = r2 (mod m2) for moduli that need not be coprime."""
+    g = math.gcd(m1, m2)
+    if (r2 - r1) % g:
+        return None
+    k = (r2 - r1) // g * pow(m1 // g, -1, m2 // g) % (m2 // g)
+    modulus = m1 // g * m2
+    return (r1 + m1 * k) % modulus, modulus
+
+
+def first_common_end(ghosts: List[Ghost]) -> Optional[int]:
+    # Before the last ghost becomes periodic a common step must be one of its prefix hits.
+    latest = max(ghosts, key=lambda g: g.start)
+    for steps in sorted(latest.prefix):
+        if all(ghost.is_end(steps) for ghost in ghosts):
+            return steps
+
+    classes = {(0, 1)}
+    for ghost in ghosts:
+        residues = {hit % ghost.period for hit in ghost.hits}
+        classes = {c for r, m in classes for residue in residues
+                   if (c := combine(r, m, residue, ghost.period)) is not None}
+        if not classes:
+            return None
+    lowest = max(max(ghost.start for ghost in ghosts), 1)
+    # Smallest member of every congruence class that is not below `lowest`.
+    return min(r - (r - lowest) // m * m for r, m in classes)
 
 
 @timer
 def solve_2(input: Input) -> Optional[int]:
-    map = input.map
-    instructs = input.instructions
-    starts = input.starting_locations
-
-    idx = 0
-    steps = 0
-    locations = starts
-    loops = [Loop([loc], False) for loc in starts]
-    while not is_end(locations):
-        # Do step.
-        instruction = instruction_map[instructs[idx]]
-        for i, loc in enumerate(locations):
-            locations[i] = map[loc][instruction]
-        steps += 1
-
-        # Move pointer.
-        idx += 1
-        if idx == len(instructs):
-            idx = 0
-
-        # Update loops.
-        finished_loops = 0
-        for i in range(0, len(loops)):
-            loop = loops[i]
-            if loop.done:
-                finished_loops += 1
-                continue
-            loop.locations.append(locations[i])
-            if locations[i][2] == 'Z':
-                loop.done = True
-
-        # Check if we're done.
-        if finished_loops == len(locations):
-            break
-
-    loop_steps = [len(loop.locations) - 1 for loop in loops]
-
-    return numpy.lcm.reduce(loop_steps)
+    network = compile_network(input.map)
+    ends = [name.endswith('Z') for name in network.names]
+    after, hits = pass_transitions(network, input.instructions, ends)
+    ghosts = [trace_ghost(network.ids[name], after, hits, len(input.instructions))
+              for name in input.starting_locations]
+    return first_common_end(ghosts)
 
 
 # ==== Solutions with test data ==== #
@@ -177,12 +269,10 @@ test_answer_2 = 6
 
 @timer
 def main():
-    start = time_ns()
     filename = 'input.txt'
     with open(filename, 'r') as f:
-        input = f.read()
-        delta = (time_ns() - start) / 1000000.0
-        print(f'Elapsed time of reading file: {delta} ms')
+        with span('reading file'):
+            input = f.read()
 
         for number in range(1, 3):
             func = globals()[f'solve_{number}']
@@ -6,10 +6,15 @@ import re
 import sys
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional, Tuple, Union, Dict, Set, Callable
+from typing import List, Optional, Tuple, Union, Dict, Set, Callable, Iterable
 from time import time_ns
 from functools import wraps, cache, cached_property, cmp_to_key
 from copy import copy
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from runner.inputs import iter_lines, streaming
+from runner.instrumentation import span, timer
 
 
 # === Useful Functions === #
@@ -19,16 +24,9 @@ def splitlines(data: str, fun=lambda x: x) -> List[str]:
     return [fun(line) for line in data.splitlines() if line]
 
 
-def timer(f):
-    @wraps(f)
-    def wrapper(*args, **kwargs):
-        start = time_ns()
-        result = f(*args, **kwargs)
-        delta = (time_ns() - start) / 1000000.0
-        print(f'Elapsed time of {f.__name__}: {delta} ms')
-        return result
-
-    return wrapper
+def exact_dtype(bound: int):
+    # Python integers where values up to `bound` could overflow int64.
+    return numpy.int64 if bound < 2 ** 62 else object
 
 
 # === Types === #
@@ -36,7 +34,6 @@ def timer(f):
 
 @dataclass
 class Input:
-    lines: List[str]
     values: List[List[int]]
 
 
@@ -44,66 +41,57 @@ class Input:
 
 
 @timer
-def parse_input(data: str, options: dict) -> Input:
-    lines = splitlines(data)
-    values = [[int(v) for v in line.split(' ')] for line in lines]
-    return Input(lines, values)
+def parse_input(data: Union[str, Iterable[str]], options: dict) -> Input:
+    values = [[int(v) for v in line.split(' ')] for line in iter_lines(data)]
+    return Input(values)
 
 
-def parse_input_1(data: str) -> Input:
+@streaming
+def parse_input_1(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
-def parse_input_2(data: str) -> Input:
+@streaming
+def parse_input_2(data: Union[str, Iterable[str]]) -> Input:
     return parse_input(data, options={})
 
 
 # === Solutions === #
 
 
-memoize = {}
-
+def extrapolation_weights(length: int, backwards: bool) -> List[int]:
+    # A sequence whose differences vanish at depth `length` is a polynomial of
+    # lower degree, so Newton's forward differences give its neighbours as
+    # alternating binomial sums of the known values.
+    if backwards:
+        return [(-1) ** k * math.comb(length, k + 1) for k in range(length)]
+    return [(-1) ** (length - 1 - k) * math.comb(length, k) for k in range(length)]
 
-def next_value(seq: List[int]) -> int:
-    key = ' '.join([str(s) for s in seq])
-    if key in memoize:
-        return memoize[key]
 
-    all_zeroes = True
-    for val in seq:
-        if val != 0:
-            all_zeroes = False
-            break
-    if all_zeroes:
-        memoize[key] = 0
-        return 0
+def extrapolate(values: List[List[int]], backwards: bool = False) -> int:
+    """Sums the next (or previous) values of all sequences, batching sequences of equal length."""
+    by_length = {}
+    for seq in values:
+        by_length.setdefault(len(seq), []).append(seq)
 
-    diffs = []
-    last_idx = len(seq) - 1
-    for idx in range(0, last_idx):
-        diffs.append(seq[idx + 1] - seq[idx])
-    answer = seq[last_idx] + next_value(diffs)
-    memoize[key] = answer
-    return answer
+    total = 0
+    for length, seqs in by_length.items():
+        weights = extrapolation_weights(length, backwards)
+        largest = max(abs(v) for seq in seqs for v in seq)
+        dtype = exact_dtype(max(map(abs, weights)) * max(largest, 1) * length)
+        matrix = numpy.array(seqs, dtype=dtype)
+        total += int((matrix @ numpy.array(weights, dtype=dtype)).sum())
+    return total
 
 
 @timer
 def solve_1(input: Input) -> Optional[int]:
-    values = input.values
-    sum = 0
-    for seq in values:
-        sum += next_value(seq)
-    return sum
+    return extrapolate(input.values)
 
 
 @timer
 def solve_2(input: Input) -> Optional[int]:
-    values = input.values
-    sum = 0
-    for seq in values:
-        seq.reverse()
-        sum += next_value(seq)
-    return sum
+    return extrapolate(input.values, backwards=True)
 
 
 # ==== Solutions with test data ==== #
@@ -123,12 +111,10 @@ test_answer_2 = 2
 
 @timer
 def main():
-    start = time_ns()
     filename = 'input.txt'
     with open(filename, 'r') as f:
-        input = f.read()
-        delta = (time_ns() - start) / 1000000.0
-        print(f'Elapsed time of reading file: {delta} ms')
+        with span('reading file'):
+            input = f.read()
 
         for number in range(1, 3):
             func = globals()[f'solve_{number}']
@@ -0,0 +1,7 @@
+from .discovery import Day, Part, find_days, find_parts, load_day
+from .execution import PartResult, Timing, format_report, run_day, run_part
+from .parallel import run_parallel
+from .benchmark import Stats, benchmark_day, find_regressions, load_results
+from .instrumentation import Collector, Span, span, timer
+from .inputs import InputFile, iter_lines, iter_records, mutates_input, streaming
+from .cache import ParseCache
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import argparse
+import sys
+
+from . import cache
+from .benchmark import benchmark_day, dump_results, find_regressions, format_benchmark, load_results
+from .discovery import ROOT, find_days, load_day
+from .execution import format_error, format_report, load_failure, run_day
+from .instrumentation import Collector, disable, enable
+from .parallel import run_parallel
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='runner', description='Run solutions of many days in one process.')
+    parser.add_argument('targets', nargs='*', help='days to run, e.g. 2023, 2023/day5 or "2022/day*"')
+    parser.add_argument('-v', '--verbose', action='store_true', help='show output printed by the solutions')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='run parts across a process pool of this size, 0 for one process per core')
+    parser.add_argument('-t', '--timeout', type=float, help='seconds a single part may run in parallel mode')
+    parser.add_argument('-b', '--benchmark', metavar='FILE', help='benchmark every part and write JSON results')
+    parser.add_argument('--baseline', metavar='FILE', help='JSON results to compare the benchmark against')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative slowdown of a median reported as regression')
+    parser.add_argument('--noise', type=float, default=1.0,
+                        help='microseconds a median may grow by before it can count as regression')
+    parser.add_argument('--min-time', type=float, default=1.0, help='seconds to spend measuring each part')
+    parser.add_argument('--trace', metavar='FILE', help='record timing spans of a serial run into FILE')
+    parser.add_argument('--trace-format', choices=['chrome', 'json'], default='chrome', help='format of the trace file')
+    parser.add_argument('--cache', metavar='DIR', nargs='?', const=str(ROOT / '.cache'),
+                        help='reuse parsed inputs stored in DIR, ./.cache if no directory is given')
+    parser.add_argument('--cache-size', type=int, default=256, help='megabytes the parse cache may occupy')
+    args = parser.parse_args()
+    if args.trace and args.jobs != 1:
+        parser.error('--trace can only be used with serial runs')
+
+    collector = enable(Collector()) if args.trace else None
+    if collector is None:
+        disable()
+
+    if args.cache:
+        cache.enable(cache.ParseCache(args.cache, args.cache_size * 1024 * 1024))
+
+    paths = find_days(args.targets)
+    if args.benchmark:
+        return benchmark(paths, args)
+    if args.jobs != 1:
+        results = run_parallel(paths, args.jobs, args.timeout, args.verbose)
+    else:
+        results = []
+        for path in paths:
+            try:
+                day = load_day(path)
+            except Exception:
+                results.append(load_failure(path))
+                continue
+            results.extend(run_day(day, args.verbose))
+    print(format_report(results))
+    if collector is not None:
+        with open(args.trace, 'w') as f:
+            f.write(collector.to_chrome_trace() if args.trace_format == 'chrome' else collector.to_json())
+    return 0 if all(r.passed for r in results) else 1
+
+
+def benchmark(paths, args) -> int:
+    results = {}
+    errors = {}
+    for path in paths:
+        try:
+            day = load_day(path)
+        except Exception:
+            errors[path.relative_to(ROOT).as_posix()] = format_error()
+            continue
+        results.update(benchmark_day(day, errors, min_time=args.min_time))
+    dump_results(results, args.benchmark, errors)
+    regressions = []
+    if args.baseline:
+        regressions = find_regressions(load_results(args.baseline), results, args.threshold,
+                                       int(args.noise * 1000))
+    print(format_benchmark(results, regressions, errors))
+    return 1 if regressions or errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import math
+import platform
+import statistics
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from .discovery import Day, Part
+from .execution import format_error, open_input, run_once
+from .inputs import InputFile
+
+
+# === Types === #
+
+
+@dataclass
+class Stats:
+    iterations: int
+    min_ns: int
+    median_ns: int
+    p95_ns: int
+
+
+@dataclass
+class Regression:
+    key: str
+    phase: str
+    baseline_ns: int
+    current_ns: int
+
+    @property
+    def ratio(self) -> float:
+        return self.current_ns / self.baseline_ns
+
+
+# === Measuring === #
+
+
+def percentile(samples: List[int], fraction: float) -> int:
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(samples: List[int]) -> Stats:
+    return Stats(len(samples), min(samples), int(statistics.median(samples)), percentile(samples, 0.95))
+
+
+def benchmark_part(part: Part, data: InputFile, warmup: int = 1, min_time: float = 1.0,
+                   max_iterations: int = 1000) -> Dict[str, Stats]:
+    """Times parse and solve separately, repeating until about `min_time` seconds were measured.
+
+    Every iteration parses afresh, so solvers that mutate their input are measured correctly.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            run_once(part, data)
+
+        parse = []
+        solve = []
+        budget = min_time * 1e9
+        while len(solve) < max_iterations and (not solve or budget > 0):
+            _, timing = run_once(part, data)
+            parse.append(timing.parse_ns)
+            solve.append(timing.solve_ns)
+            budget -= timing.total_ns
+
+    stats = {'solve': summarize(solve)}
+    if part.parse is not None:
+        stats['parse'] = summarize(parse)
+    return stats
+
+
+def benchmark_day(day: Day, errors: Optional[Dict[str, str]] = None, **options) -> Dict[str, Dict[str, Stats]]:
+    """Benchmarks every part of a day; parts that raise are left out and noted in `errors`."""
+    data = open_input(day)
+    if data is None:
+        return {}
+    results = {}
+    with data:
+        for part in day.parts:
+            key = f'{day.name} part {part.number}'
+            try:
+                results[key] = benchmark_part(part, data, **options)
+            except Exception:
+                if errors is None:
+                    raise
+                errors[key] = format_error()
+    return results
+
+
+# === Results === #
+
+
+def dump_results(results: Dict[str, Dict[str, Stats]], filename: str, errors: Optional[Dict[str, str]] = None):
+    document = {
+        'errors': errors or {},
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': {key: {phase: asdict(stats) for phase, stats in phases.items()}
+                    for key, phases in results.items()},
+    }
+    with open(filename, 'w') as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+
+
+def load_results(filename: str) -> Dict[str, Dict[str, Stats]]:
+    with open(filename, 'r') as f:
+        document = json.load(f)
+    return {key: {phase: Stats(**stats) for phase, stats in phases.items()}
+            for key, phases in document['results'].items()}
+
+
+def find_regressions(baseline: Dict[str, Dict[str, Stats]], current: Dict[str, Dict[str, Stats]],
+                     threshold: float = 0.1, noise_ns: int = 1000) -> List[Regression]:
+    """Compares medians; differences below `noise_ns` are ignored as timer jitter."""
+    regressions = []
+    for key, phases in current.items():
+        for phase, stats in phases.items():
+            base: Optional[Stats] = baseline.get(key, {}).get(phase)
+            if base is None or stats.median_ns - base.median_ns < noise_ns:
+                continue
+            if stats.median_ns > base.median_ns * (1 + threshold):
+                regressions.append(Regression(key, phase, base.median_ns, stats.median_ns))
+    return regressions
+
+
+def format_benchmark(results: Dict[str, Dict[str, Stats]], regressions: List[Regression],
+                     errors: Optional[Dict[str, str]] = None) -> str:
+    lines = []
+    for key, phases in results.items():
+        for phase, stats in phases.items():
+            lines.append(f'{key} {phase}: min {stats.min_ns / 1e6:.3f} ms, median {stats.median_ns / 1e6:.3f} ms, '
+                         f'p95 {stats.p95_ns / 1e6:.3f} ms ({stats.iterations} iterations)')
+    for key, error in (errors or {}).items():
+        lines.append(f'{key}: error - {error}')
+    for r in regressions:
+        lines.append(f'Regression in {r.key} {r.phase}: {r.baseline_ns / 1e6:.3f} ms -> {r.current_ns / 1e6:.3f} ms '
+                     f'({r.ratio:.2f}x)')
+    return '\n'.join(lines)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import zlib
+from functools import cache
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .inputs import InputFile
+
+
+MISS = object()
+
+
+# === Keys === #
+
+
+@cache
+def source_digest(filename: str) -> str:
+    with open(filename, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def parse_key(parse: Callable, data: InputFile) -> str:
+    # The whole solution file is hashed, so edits to helpers and types the
+    # parser depends on invalidate the entry as well.
+    module = sys.modules[parse.__module__]
+    key = hashlib.sha256()
+    key.update(source_digest(module.__file__).encode())
+    key.update(parse.__qualname__.encode())
+    key.update(data.digest.encode())
+    return key.hexdigest()
+
+
+# === Storage === #
+
+
+class ParseCache:
+    """Parsed inputs pickled and compressed on disk, evicted least recently used first."""
+
+    def __init__(self, directory: Path, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        return self.directory / f'{key}.pickle.z'
+
+    def load(self, key: str) -> Any:
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.loads(zlib.decompress(f.read()))
+        except (OSError, zlib.error, pickle.UnpicklingError, AttributeError, EOFError):
+            return MISS
+        os.utime(path)
+        return value
+
+    def store(self, key: str, value: Any):
+        try:
+            blob = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        except (pickle.PicklingError, TypeError, AttributeError, RecursionError):
+            return
+        if len(blob) > self.max_bytes:
+            return
+        fd, temporary = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(blob)
+        os.replace(temporary, self.path(key))
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for path in self.directory.glob('*.pickle.z'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+_cache: Optional[ParseCache] = None
+
+
+def enable(parse_cache: ParseCache) -> ParseCache:
+    global _cache
+    _cache = parse_cache
+    return _cache
+
+
+def current() -> Optional[ParseCache]:
+    return _cache
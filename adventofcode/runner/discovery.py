@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import importlib.util
+import re
+import sys
+from dataclasses import dataclass, field
+from functools import cache
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, List, Optional
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+# === Types === #
+
+
+@dataclass
+class Part:
+    number: int
+    solve: Callable
+    parse: Optional[Callable]
+    test_data: Optional[str]
+    test_answer: Any
+    mutates: bool = False
+
+
+@dataclass
+class Day:
+    name: str
+    path: Path
+    module: ModuleType
+    parts: List[Part] = field(default_factory=list)
+
+    @property
+    def input_path(self) -> Path:
+        return self.path / 'input.txt'
+
+
+# === Discovery === #
+
+
+def day_key(path: Path) -> tuple:
+    numbers = [int(n) for n in re.findall(r'\d+', path.relative_to(ROOT).as_posix())]
+    return tuple(numbers), path.name
+
+
+def find_days(targets: List[str], root: Path = ROOT) -> List[Path]:
+    """Resolves targets like `2023`, `2023/day5` or `2022/day*` into day directories."""
+    paths = set()
+    for target in targets or ['*']:
+        for path in root.glob(target):
+            if (path / 'solution.py').is_file():
+                paths.add(path)
+            else:
+                paths.update(p.parent for p in path.glob('*/solution.py'))
+    return sorted(paths, key=day_key)
+
+
+def load_module(path: Path) -> ModuleType:
+    name = 'aoc_' + re.sub(r'\W', '_', path.relative_to(ROOT).as_posix())
+    spec = importlib.util.spec_from_file_location(name, path / 'solution.py')
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def find_parts(module: ModuleType) -> List[Part]:
+    # Older days list their parts in `solves`, newer ones follow the
+    # `solve_1`/`parse_input_1`/`test_data_1` naming convention.
+    solves = getattr(module, 'solves', None)
+    if solves is not None:
+        return [Part(number, solve['func'], solve.get('parse'), solve.get('test_data'), solve.get('test_answer'),
+                     solve.get('mutates', getattr(solve['func'], 'mutates_input', False)))
+                for number, solve in enumerate(solves, start=1)]
+
+    parts = []
+    number = 1
+    while hasattr(module, f'solve_{number}'):
+        solve = getattr(module, f'solve_{number}')
+        parts.append(Part(number,
+                          solve,
+                          getattr(module, f'parse_input_{number}', None),
+                          getattr(module, f'test_data_{number}', None),
+                          getattr(module, f'test_answer_{number}', None),
+                          getattr(solve, 'mutates_input', False)))
+        number += 1
+    return parts
+
+
+@cache
+def load_day(path: Path) -> Day:
+    module = load_module(path)
+    return Day(path.relative_to(ROOT).as_posix(), path, module, find_parts(module))
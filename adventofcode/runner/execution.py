@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import contextlib
+import inspect
+import io
+import traceback
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from . import cache
+from .discovery import ROOT, Day, Part
+from .inputs import InputFile
+from .instrumentation import span
+
+
+# === Types === #
+
+
+@dataclass
+class Timing:
+    parse_ns: int = 0
+    solve_ns: int = 0
+    cached: bool = False
+    shared: bool = False
+
+    @property
+    def total_ns(self) -> int:
+        return self.parse_ns + self.solve_ns
+
+
+@dataclass
+class PartResult:
+    day: str
+    number: int
+    passed: bool
+    expected: Any = None
+    got: Any = None
+    answer: Any = None
+    test: Timing = None
+    real: Timing = None
+    error: Optional[str] = None
+
+
+# === Execution === #
+
+
+def timed(func: Callable, *args) -> Tuple[Any, int]:
+    start = perf_counter_ns()
+    result = func(*args)
+    return result, perf_counter_ns() - start
+
+
+def source(part: Part, data: Union[str, InputFile]):
+    if isinstance(data, InputFile):
+        return data.lines() if getattr(part.parse, 'streaming', False) else data.text
+    return data
+
+
+def parse(part: Part, data: Union[str, InputFile], timing: Timing) -> Any:
+    parse_cache = cache.current()
+    if parse_cache is None or not isinstance(data, InputFile):
+        input, timing.parse_ns = timed(part.parse, source(part, data))
+        return input
+
+    key = cache.parse_key(part.parse, data)
+    input, timing.parse_ns = timed(parse_cache.load, key)
+    if input is not cache.MISS:
+        timing.cached = True
+        return input
+    input, timing.parse_ns = timed(part.parse, source(part, data))
+    parse_cache.store(key, input)
+    return input
+
+
+def parse_signature(parse: Callable) -> Optional[tuple]:
+    # `parse_input1` and `parse_input2` usually only differ in their name, so
+    # parsers with the same bytecode, constants and globals parse alike.
+    code = getattr(inspect.unwrap(parse), '__code__', None)
+    if code is None or code.co_freevars:
+        return None
+    return parse.__module__, code.co_code, code.co_consts, code.co_names
+
+
+def shared_parse(part: Part, data: Union[str, InputFile], timing: Timing, shared: Dict[tuple, Any]) -> Any:
+    # Solvers that mutate their input get a fresh parse of their own, so the
+    # shared result is never modified and never needs copying.
+    signature = parse_signature(part.parse)
+    if signature is None or part.mutates:
+        return parse(part, data, timing)
+
+    key = signature, data if isinstance(data, str) else id(data)
+    if key in shared:
+        timing.shared = True
+        return shared[key]
+    shared[key] = parse(part, data, timing)
+    return shared[key]
+
+
+def run_once(part: Part, data: Union[str, InputFile], shared: Optional[Dict[tuple, Any]] = None) -> Tuple[Any, Timing]:
+    """Parses and solves one input; with `shared` parse results are reused between parts."""
+    timing = Timing()
+    if part.parse is None:
+        input = source(part, data)
+    else:
+        with span('parse'):
+            if shared is None:
+                input = parse(part, data, timing)
+            else:
+                input = shared_parse(part, data, timing, shared)
+    with span('solve'):
+        result, timing.solve_ns = timed(part.solve, input)
+    return result, timing
+
+
+def format_error() -> str:
+    # Last line of the traceback of the exception being handled, e.g. `ValueError: ...`.
+    return traceback.format_exc(limit=-1).strip().splitlines()[-1]
+
+
+def load_failure(path: Path, number: int = 0) -> PartResult:
+    """Result for a part, or with `number` 0 all parts of a day, that failed outside of run_part.
+
+    Must be called while handling the error.
+    """
+    return PartResult(path.relative_to(ROOT).as_posix(), number, passed=False, error=format_error())
+
+
+def run_part(day: Day, part: Part, data: Optional[InputFile], verbose: bool = False,
+             shared: Optional[Dict[tuple, Any]] = None) -> PartResult:
+    result = PartResult(day.name, part.number, passed=False, expected=part.test_answer)
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with output, span(f'{day.name} part {part.number}'):
+        try:
+            if part.test_data is not None:
+                result.got, result.test = run_once(part, part.test_data, shared)
+                result.passed = result.got == part.test_answer
+                if not result.passed:
+                    return result
+            else:
+                result.passed = True
+            if data is not None:
+                result.answer, result.real = run_once(part, data, shared)
+        except Exception:
+            result.passed = False
+            result.error = format_error()
+    return result
+
+
+def open_input(day: Day) -> Optional[InputFile]:
+    if not day.input_path.is_file():
+        return None
+    with span('reading file'):
+        return InputFile(day.input_path)
+
+
+def run_day(day: Day, verbose: bool = False) -> List[PartResult]:
+    data = open_input(day)
+    try:
+        shared = {}
+        return [run_part(day, part, data, verbose, shared) for part in day.parts]
+    finally:
+        if data is not None:
+            data.close()
+
+
+# === Report === #
+
+
+def format_ms(timing: Optional[Timing]) -> str:
+    if timing is None:
+        return '-'
+    note = ', shared parse' if timing.shared else ', cached parse' if timing.cached else ''
+    return f'{timing.total_ns / 1000000.0:.3f} ms{note}'
+
+
+def format_result(result: PartResult) -> str:
+    prefix = f'{result.day} part {result.number}' if result.number else result.day
+    if result.error is not None:
+        return f'{prefix}: error - {result.error}'
+    if not result.passed:
+        return f'{prefix}: test has failed. Correct: {result.expected}, but got: {result.got}'
+    if result.real is None:
+        return f'{prefix}: test has passed ({format_ms(result.test)}), no input'
+    return f'{prefix}: {result.answer} ({format_ms(result.real)}, test {format_ms(result.test)})'
+
+
+def format_report(results: List[PartResult]) -> str:
+    lines = [format_result(result) for result in results]
+    total = sum(r.real.total_ns for r in results if r.real is not None)
+    failed = sum(1 for r in results if not r.passed)
+    lines.append(f'{len(results)} parts, {failed} failed, {total / 1000000.0:.3f} ms solving real inputs')
+    return '\n'.join(lines)
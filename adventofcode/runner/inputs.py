@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+from functools import cached_property
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Union
+
+
+# === Lazy line sources === #
+
+
+def iter_lines(data: Union[str, Iterable[str]], keep_empty: bool = False) -> Iterator[str]:
+    """Yields lines of a string or of an already lazy line source, such as `InputFile.lines()`."""
+    lines = data.splitlines() if isinstance(data, str) else data
+    return iter(lines) if keep_empty else (line for line in lines if line)
+
+
+def iter_records(data: Union[str, Iterable[str]]) -> Iterator[List[str]]:
+    """Yields groups of lines separated by blank lines."""
+    record = []
+    for line in iter_lines(data, keep_empty=True):
+        if line:
+            record.append(line)
+        elif record:
+            yield record
+            record = []
+    if record:
+        yield record
+
+
+def streaming(f):
+    # Marks a parse function that accepts an iterator of lines in place of
+    # the whole input string, so the runner can feed it from a mapped file.
+    f.streaming = True
+    return f
+
+
+def mutates_input(f):
+    # Marks a solver that changes its parsed input; the runner parses afresh
+    # for it instead of handing it the result shared between parts. Same as
+    # `'mutates': True` in a `solves` entry.
+    f.mutates_input = True
+    return f
+
+
+# === Files === #
+
+
+class InputFile:
+    """A puzzle input mapped into memory; lines are decoded one at a time."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        # Empty files can't be mapped.
+        self._map: Optional[mmap.mmap] = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def __enter__(self) -> InputFile:
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    @cached_property
+    def digest(self) -> str:
+        return hashlib.sha256(self._map if self._map is not None else b'').hexdigest()
+
+    @cached_property
+    def text(self) -> str:
+        return self._map[:].decode() if self._map is not None else ''
+
+    def lines(self) -> Iterator[str]:
+        buffer = self._map
+        if buffer is None:
+            return
+        size = len(buffer)
+        start = 0
+        while start < size:
+            end = buffer.find(b'\n', start)
+            if end == -1:
+                end = size
+            yield buffer[start:end].rstrip(b'\r').decode()
+            start = end + 1
+
+    def records(self) -> Iterator[List[str]]:
+        return iter_records(self.lines())
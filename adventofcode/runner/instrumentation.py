@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from functools import wraps
+from time import perf_counter_ns
+from typing import List, Optional
+
+
+# === Types === #
+
+
+@dataclass
+class Span:
+    name: str
+    start_ns: int
+    duration_ns: int = 0
+    depth: int = 0
+    parent: Optional[int] = None
+
+
+@dataclass
+class Collector:
+    # With `echo` every finished span is printed the way the old per-day
+    # `timer` decorators did it instead of being kept in `spans`.
+    echo: bool = False
+    spans: List[Span] = field(default_factory=list)
+    stack: List[int] = field(default_factory=list)
+
+    def open(self, name: str) -> int:
+        parent = self.stack[-1] if self.stack else None
+        self.spans.append(Span(name, perf_counter_ns(), depth=len(self.stack), parent=parent))
+        index = len(self.spans) - 1
+        self.stack.append(index)
+        return index
+
+    def close(self, index: int):
+        span = self.spans[index]
+        span.duration_ns = perf_counter_ns() - span.start_ns
+        self.stack.pop()
+        if self.echo:
+            print(f'Elapsed time of {span.name}: {span.duration_ns / 1000000.0} ms')
+            # Spans close in reverse order of opening, so this is the last one
+            # and the indices of the still open ones stay valid.
+            del self.spans[index:]
+
+    def clear(self):
+        self.spans.clear()
+        self.stack.clear()
+
+    def to_json(self) -> str:
+        return json.dumps([asdict(span) for span in self.spans], indent=2)
+
+    def to_chrome_trace(self) -> str:
+        pid = os.getpid()
+        tid = threading.get_ident()
+        events = [{'name': span.name, 'ph': 'X', 'pid': pid, 'tid': tid,
+                   'ts': span.start_ns / 1000.0, 'dur': span.duration_ns / 1000.0}
+                  for span in self.spans]
+        return json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'})
+
+
+# === Recording === #
+
+
+# Standalone scripts keep printing their timings; the runner swaps the
+# collector or disables recording altogether.
+_collector: Optional[Collector] = Collector(echo=True)
+
+
+def enable(collector: Optional[Collector] = None) -> Collector:
+    global _collector
+    _collector = collector if collector is not None else Collector()
+    return _collector
+
+
+def disable():
+    global _collector
+    _collector = None
+
+
+def current() -> Optional[Collector]:
+    return _collector
+
+
+@contextmanager
+def span(name: str):
+    collector = _collector
+    if collector is None:
+        yield
+        return
+    index = collector.open(name)
+    try:
+        yield
+    finally:
+        collector.close(index)
+
+
+def timer(f):
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        collector = _collector
+        if collector is None:
+            return f(*args, **kwargs)
+        index = collector.open(f.__name__)
+        try:
+            return f(*args, **kwargs)
+        finally:
+            collector.close(index)
+
+    return wrapper
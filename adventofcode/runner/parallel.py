@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional
+
+from .discovery import load_day
+from .execution import PartResult, load_failure, open_input, run_part
+
+
+# === Timeouts === #
+
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    # SIGALRM only exists on Unix; elsewhere tasks run without a deadline.
+    if not seconds or not hasattr(signal, 'setitimer'):
+        yield
+        return
+
+    def expire(signum, frame):
+        raise TimeoutError(f'exceeded {seconds} s')
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+# === Execution === #
+
+
+def run_task(path: Path, number: int, timeout: Optional[float], verbose: bool) -> PartResult:
+    day = load_day(path)
+    part = day.parts[number - 1]
+    data = open_input(day)
+    try:
+        with deadline(timeout):
+            return run_part(day, part, data, verbose)
+    finally:
+        if data is not None:
+            data.close()
+
+
+def run_parallel(paths: List[Path], jobs: Optional[int] = None,
+                 timeout: Optional[float] = None, verbose: bool = False) -> List[PartResult]:
+    """Runs every part of every day across a process pool, keeping the input order of results.
+
+    Days that fail to load and parts whose worker fails are reported as errors.
+    """
+    tasks = []
+    for path in paths:
+        try:
+            tasks.extend((path, part.number) for part in load_day(path).parts)
+        except Exception:
+            tasks.append(load_failure(path))
+
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(tasks)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [task if isinstance(task, PartResult) else executor.submit(run_task, *task, timeout, verbose)
+                   for task in tasks]
+        results = []
+        for task, future in zip(tasks, futures):
+            if isinstance(future, PartResult):
+                results.append(future)
+                continue
+            try:
+                results.append(future.result())
+            except Exception:
+                results.append(load_failure(*task))
+        return results